@@ -0,0 +1,78 @@
+"""Compare two benchmark result files and flag regressions.
+
+Usage:
+    python -m benchmarks.compare baseline.json current.json [--threshold 0.2]
+
+Exits with status 1 if any metric got slower by more than the threshold.
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, Iterator, Tuple
+
+# Metrics below this many milliseconds are too noisy to flag as regressions
+NOISE_FLOOR_MS = 1.0
+
+
+def _flatten(results: dict) -> Dict[str, float]:
+    """Map "graph.metric" names to millisecond values."""
+    flat: Dict[str, float] = {}
+
+    def visit(prefix: str, value) -> Iterator[Tuple[str, float]]:
+        if isinstance(value, dict):
+            for key, child in value.items():
+                yield from visit(f"{prefix}.{key}", child)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool) and "_ms" in prefix:
+            yield prefix, float(value)
+
+    for section in ("graphs", "micro"):
+        for name, metrics in results.get(section, {}).items():
+            flat.update(visit(name, metrics))
+    return flat
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> bool:
+    """Print a comparison table; return True if there is a regression."""
+    before, after = _flatten(baseline), _flatten(current)
+    print(f"Baseline: {baseline.get('meta', {}).get('commit')}  Current: {current.get('meta', {}).get('commit')}")
+    width = max([len(name) for name in before] + [6])
+    print(f"{'Metric':<{width}}  {'Before':>10}  {'After':>10}  {'Change':>8}")
+
+    regressed = False
+    for name in sorted(set(before) | set(after)):
+        old, new = before.get(name), after.get(name)
+        if old is None or new is None:
+            print(f"{name:<{width}}  {old if old is not None else '-':>10}  {new if new is not None else '-':>10}")
+            continue
+        change = (new - old) / old if old else 0.0
+        flag = ""
+        if change > threshold and new - old > NOISE_FLOOR_MS:
+            flag = "  REGRESSION"
+            regressed = True
+        print(f"{name:<{width}}  {old:>10.2f}  {new:>10.2f}  {change:>+7.1%}{flag}")
+
+    for name, metrics in current.get("graphs", {}).items():
+        if not metrics.get("ok", True):
+            print(f"{name}: FAILED ({metrics.get('error')})")
+            regressed = True
+    return regressed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed relative slowdown (default 0.2)")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    sys.exit(1 if compare(baseline, current, args.threshold) else 0)
+
+
+if __name__ == "__main__":
+    main()
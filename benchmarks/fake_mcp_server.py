@@ -0,0 +1,123 @@
+"""Local MCP server replaying canned GitHub and todo responses for benchmarks.
+
+Usage:
+    python benchmarks/fake_mcp_server.py github
+    python benchmarks/fake_mcp_server.py todo
+"""
+
+import json
+import sys
+
+from mcp.server.fastmcp import FastMCP
+
+OWNER = "jaganraajan"
+REPO = "7-habits-agent-graph"
+
+
+def _repo(i: int) -> dict:
+    return {
+        "name": f"agent-repo-{i}",
+        "full_name": f"example/agent-repo-{i}",
+        "html_url": f"https://github.com/example/agent-repo-{i}",
+        "description": f"Agentic framework example number {i} with MCP support",
+        "stargazers_count": 1000 - i * 37,
+        "language": "Python",
+    }
+
+
+def _issue(i: int) -> dict:
+    return {
+        "title": f"Improve collaboration docs ({i})",
+        "html_url": f"https://github.com/example/agent-repo-{i % 5}/issues/{100 + i}",
+        "labels": [{"name": "good first issue"}, {"name": "documentation"}],
+        "repository": {"full_name": f"example/agent-repo-{i % 5}"},
+        "state": "open",
+        "body": "Shared learning and team synergy for agentic AI contributors.",
+    }
+
+
+def build_github_server() -> FastMCP:
+    server = FastMCP("fake-github", log_level="WARNING")
+
+    @server.tool()
+    def search_repositories(query: str, page: int = 1, perPage: int = 10) -> str:
+        """Search GitHub repositories."""
+        return json.dumps({"total_count": 10, "items": [_repo(i) for i in range(10)]})
+
+    @server.tool()
+    def search_issues(q: str, page: int = 1, perPage: int = 15) -> str:
+        """Search GitHub issues and pull requests."""
+        return json.dumps({"total_count": 15, "items": [_issue(i) for i in range(15)]})
+
+    @server.tool()
+    def search_code(q: str, page: int = 1, perPage: int = 10) -> str:
+        """Search code across GitHub repositories."""
+        items = [
+            {"name": "COLLABORATION.md", "path": "docs/COLLABORATION.md",
+             "html_url": f"https://github.com/example/agent-repo-{i}/blob/main/docs/COLLABORATION.md"}
+            for i in range(5)
+        ]
+        return json.dumps({"total_count": len(items), "items": items})
+
+    @server.tool()
+    def get_file_contents(owner: str, repo: str, path: str) -> str:
+        """Get the contents of a file in a repository."""
+        return json.dumps({
+            "name": path.rsplit("/", 1)[-1],
+            "path": path,
+            "type": "file",
+            "size": 2048,
+            "html_url": f"https://github.com/{owner}/{repo}/blob/main/{path}",
+            "content": "# Contributing\n\nWe welcome win-win collaboration. " * 20,
+        })
+
+    @server.tool()
+    def list_commits(owner: str, repo: str, perPage: int = 5) -> str:
+        """List commits of a repository."""
+        commits = [
+            {"sha": f"{i:07x}", "commit": {"message": f"Benchmark commit {i}", "author": {"name": "bench"}},
+             "html_url": f"https://github.com/{owner}/{repo}/commit/{i:07x}"}
+            for i in range(perPage)
+        ]
+        return json.dumps(commits)
+
+    @server.tool()
+    def list_pull_requests(owner: str, repo: str, state: str = "open", perPage: int = 5) -> str:
+        """List pull requests of a repository."""
+        prs = [
+            {"number": 40 + i, "title": f"Benchmark PR {i}", "state": state,
+             "user": {"login": "bench"}, "html_url": f"https://github.com/{owner}/{repo}/pull/{40 + i}"}
+            for i in range(perPage)
+        ]
+        return json.dumps(prs)
+
+    return server
+
+
+def build_todo_server() -> FastMCP:
+    server = FastMCP("fake-todo", log_level="WARNING")
+    tasks = [{"id": i, "title": f"Task {i}", "status": "pending"} for i in range(1, 6)]
+
+    @server.tool()
+    def list_tasks() -> str:
+        """List all tasks."""
+        return json.dumps(tasks)
+
+    @server.tool()
+    def add_task(title: str, description: str = "", due_date: str = "", priority: str = "medium") -> str:
+        """Add a new task."""
+        # Responses stay canned so repeated benchmark runs are identical
+        return json.dumps({"id": 99, "title": title, "status": "pending"})
+
+    return server
+
+
+SERVERS = {
+    "github": build_github_server,
+    "todo": build_todo_server,
+}
+
+
+if __name__ == "__main__":
+    name = sys.argv[1] if len(sys.argv) > 1 else "github"
+    SERVERS[name]().run("stdio")
@@ -0,0 +1,118 @@
+"""Deterministic stand-ins for the remote services used by the graphs."""
+
+import hashlib
+from typing import Any, List, Optional, Sequence
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from framework.llm import FrameworkChatModelMixin
+
+# Tools the fake model prefers to call, in order, when several are bound
+PREFERRED_TOOLS = [
+    "search_repositories",
+    "search_issues",
+    "get_file_contents",
+    "list_commits",
+    "list_pull_requests",
+    "search_code",
+    "list_tasks",
+]
+
+FAKE_PROMPT = "You are a helpful assistant used for offline benchmarking."
+
+
+def fake_get_prompt(name: str, label: str = "production") -> str:
+    """Replacement for framework.prompt_manager.get_prompt that never calls Langfuse."""
+    return FAKE_PROMPT
+
+
+def _example_value(schema: dict) -> Any:
+    types = {"string": "benchmark", "integer": 5, "number": 1.0, "boolean": False, "array": [], "object": {}}
+    return types.get(schema.get("type"), "benchmark")
+
+
+class _FakeChatModel(BaseChatModel):
+    """Chat model that answers deterministically without network.
+
+    When tools are bound and the last message is not a tool result, it calls the
+    most relevant bound tool with arguments derived from the tool schema;
+    otherwise it returns a markdown answer derived from the conversation.
+    """
+
+    api_key: Optional[str] = None
+    azure_endpoint: Optional[str] = None
+    api_version: Optional[str] = None
+    deployment_name: str = "fake"
+    http_client: Any = None
+    http_async_client: Any = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-azure-chat-openai"
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any):
+        return self.bind(tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs)
+
+    def _pick_tool(self, tools: List[dict]) -> dict:
+        by_name = {tool["function"]["name"]: tool for tool in tools}
+        for name in PREFERRED_TOOLS:
+            if name in by_name:
+                return by_name[name]
+        return tools[0]
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        tools: Optional[List[dict]] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        prompt_chars = sum(len(str(m.content)) for m in messages)
+        digest = hashlib.sha256(str([m.content for m in messages]).encode("utf-8")).hexdigest()[:8]
+
+        if tools and not isinstance(messages[-1], ToolMessage):
+            tool = self._pick_tool(tools)["function"]
+            properties = tool.get("parameters", {}).get("properties", {})
+            required = tool.get("parameters", {}).get("required", [])
+            args = {name: _example_value(properties[name]) for name in required if name in properties}
+            message = AIMessage(
+                content="",
+                tool_calls=[{"name": tool["name"], "args": args, "id": f"call_{digest}", "type": "tool_call"}],
+            )
+        else:
+            message = AIMessage(
+                content=(
+                    f"## Benchmark response {digest}\n\n"
+                    f"- Processed {len(messages)} messages ({prompt_chars} characters)\n"
+                    f"- See https://github.com/example/agent-repo-{int(digest, 16) % 10}\n"
+                )
+            )
+
+        completion_chars = len(str(message.content)) + len(str(message.tool_calls))
+        message.usage_metadata = {
+            "input_tokens": prompt_chars // 4,
+            "output_tokens": completion_chars // 4,
+            "total_tokens": (prompt_chars + completion_chars) // 4,
+        }
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        tools: Optional[List[dict]] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        # Answer inline instead of via the default executor so async graphs stay on the loop;
+        # called unbound so the framework mixin does not handle the request twice
+        return _FakeChatModel._generate(self, messages, stop=stop, tools=tools, **kwargs)
+
+
+class FakeAzureChatOpenAI(FrameworkChatModelMixin, _FakeChatModel):
+    """Drop-in for FrameworkAzureChatOpenAI, keeping the framework's request handling."""
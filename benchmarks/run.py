@@ -0,0 +1,227 @@
+"""Run every registered graph offline and report framework overhead as JSON.
+
+The graphs run against FakeAzureChatOpenAI and a local fake MCP server, so no
+network access or credentials are needed.
+
+Usage:
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run 01-linear 02-tooluse --iterations 20
+    python -m benchmarks.compare baseline.json bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+PROJECT_ROOT = Path(__file__).parent.parent
+FAKE_MCP_SERVER = Path(__file__).parent / "fake_mcp_server.py"
+
+BENCH_MESSAGE = "Summarize recent activity and suggest next steps."
+
+
+def _isolate_environment(checkpointer: str) -> None:
+    """Make sure nothing can reach a real service while benchmarking."""
+    for var in list(os.environ):
+        if var.startswith(("LANGFUSE_", "AZURE_OPENAI_", "OPENAI_", "PPLX_", "TWILIO_")):
+            del os.environ[var]
+    os.environ["CHECKPOINTER_BACKEND"] = checkpointer
+    os.environ["GRAPH_DIAGRAMS"] = "off"
+
+
+def _write_mcp_config(directory: str) -> str:
+    config = {
+        "mcpServers": {
+            name: {"command": sys.executable, "args": [str(FAKE_MCP_SERVER), name]}
+            for name in ("github", "todo")
+        }
+    }
+    path = os.path.join(directory, "mcp_config.json")
+    with open(path, "w") as f:
+        json.dump(config, f)
+    return path
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 3)
+
+
+def _distribution(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "mean": _ms(statistics.fmean(ordered)),
+        "p50": _ms(ordered[len(ordered) // 2]),
+        "p95": _ms(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]),
+        "min": _ms(ordered[0]),
+    }
+
+
+def _timed(func: Callable, totals: Dict[str, float], key: str) -> Callable:
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            totals[key] += time.perf_counter() - start
+            totals[f"{key}_count"] += 1
+    return wrapper
+
+
+def _patch_graph_modules(registry) -> None:
+    """Point the model factory and every graph module at the fakes."""
+    from benchmarks.fakes import FakeAzureChatOpenAI, fake_get_prompt
+    from framework import llm
+
+    llm.FrameworkAzureChatOpenAI = FakeAzureChatOpenAI
+    llm.reset_chat_models()
+
+    for info in registry.list_graphs():
+        module = registry.get_graph_module(info.name)
+        if module is None:
+            continue
+        if hasattr(module, "get_prompt"):
+            module.get_prompt = fake_get_prompt
+
+
+async def _bench_graph(name: str, iterations: int) -> Dict[str, Any]:
+    from framework import graph_manager
+    from framework.graph_registry import registry
+
+    result: Dict[str, Any] = {"ok": True}
+    try:
+        start = time.perf_counter()
+        graph = registry.get_build_function(name)()
+        result["build_ms"] = _ms(time.perf_counter() - start)
+
+        checkpointer = graph_manager.get_checkpointer(name)
+        totals = {"put": 0.0, "put_count": 0, "put_writes": 0.0, "put_writes_count": 0}
+        checkpointer.put = _timed(checkpointer.put, totals, "put")
+        checkpointer.put_writes = _timed(checkpointer.put_writes, totals, "put_writes")
+
+        start = time.perf_counter()
+        compiled = graph.compile(checkpointer=checkpointer)
+        result["compile_ms"] = _ms(time.perf_counter() - start)
+        graph_manager._compiled_graphs[name] = compiled
+
+        # The first call pays one-time costs (client pools, lazy imports); report it separately
+        start = time.perf_counter()
+        await graph_manager.invoke_graph(name, BENCH_MESSAGE, thread_id=str(uuid.uuid4()), is_new_thread=True)
+        result["first_invoke_ms"] = _ms(time.perf_counter() - start)
+
+        for key in totals:
+            totals[key] = 0
+        samples = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            await graph_manager.invoke_graph(name, BENCH_MESSAGE, thread_id=str(uuid.uuid4()), is_new_thread=True)
+            samples.append(time.perf_counter() - start)
+        result["invoke_ms"] = _distribution(samples)
+        result["checkpoint_write_ms_per_invoke"] = _ms((totals["put"] + totals["put_writes"]) / iterations)
+        result["checkpoint_writes_per_invoke"] = (totals["put_count"] + totals["put_writes_count"]) / iterations
+    except Exception as e:
+        result = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+    return result
+
+
+def _bench_github_utils(iterations: int) -> Dict[str, Any]:
+    """Micro-benchmark the link extraction used by the habit graphs."""
+    from langchain_core.messages import AIMessage
+    from framework.github_utils import extract_github_links_from_messages, format_github_links_for_markdown
+
+    messages = [
+        AIMessage(
+            content=" ".join(f"https://github.com/example/agent-repo-{i}/issues/{j}" for j in range(20)),
+            tool_calls=[{"name": "search_issues", "args": {"q": f"repo {i}"}, "id": f"call_{i}", "type": "tool_call"}],
+        )
+        for i in range(50)
+    ]
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        links = extract_github_links_from_messages(messages)
+        format_github_links_for_markdown(links)
+        samples.append(time.perf_counter() - start)
+    return {"extract_and_format_links_ms": _distribution(samples)}
+
+
+async def run_benchmarks(names: Optional[List[str]], iterations: int) -> Dict[str, Any]:
+    from framework.graph_registry import registry
+    from framework.mcp_registry import init_mcp_registry
+
+    workdir = tempfile.mkdtemp(prefix="graph-bench-")
+    # Keep benchmark runs out of the real usage ledger and tool manifest cache
+    os.environ["USAGE_LEDGER_PATH"] = os.path.join(workdir, "usage.db")
+    os.environ["MCP_MANIFEST_CACHE"] = os.path.join(workdir, "mcp_manifests.json")
+    await init_mcp_registry(_write_mcp_config(workdir))
+
+    _patch_graph_modules(registry)
+    names = names or sorted(info.name for info in registry.list_graphs())
+
+    # Graphs write summaries and logs relative to the working directory
+    previous_cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        graphs = {}
+        for name in names:
+            print(f"Benchmarking {name}...", file=sys.stderr)
+            graphs[name] = await _bench_graph(name, iterations)
+        micro = _bench_github_utils(iterations * 20)
+    finally:
+        os.chdir(previous_cwd)
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "iterations": iterations,
+            "checkpointer": os.environ["CHECKPOINTER_BACKEND"],
+        },
+        "graphs": graphs,
+        "micro": micro,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline benchmark for registered graphs.")
+    parser.add_argument("graphs", nargs="*", help="Graph names to benchmark (default: all)")
+    parser.add_argument("--iterations", type=int, default=5, help="Invocations per graph")
+    parser.add_argument("--checkpointer", default="memory", help="Checkpointer backend to benchmark")
+    parser.add_argument("--output", help="Write JSON results to this file instead of stdout")
+    args = parser.parse_args()
+
+    _isolate_environment(args.checkpointer)
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+    results = asyncio.run(run_benchmarks(args.graphs, max(1, args.iterations)))
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+        print(f"Results written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
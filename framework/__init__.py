@@ -1,5 +1,12 @@
 """Framework for LangGraph Chat Workshop."""
 
-from .chat_ui import run_chat_ui
-
 __all__ = ["run_chat_ui"]
+
+
+def __getattr__(name):
+    # Imported on first use so that e.g. listing graphs does not load the UI,
+    # langchain and langgraph
+    if name == "run_chat_ui":
+        from .chat_ui import run_chat_ui
+        return run_chat_ui
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
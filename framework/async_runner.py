@@ -0,0 +1,42 @@
+"""One shared background event loop for synchronous hosts such as Flask.
+
+Request threads submit coroutines here instead of creating a new event loop per
+request, so every graph invocation shares one loop (and the async HTTP and MCP
+connection pools bound to it) and many invocations run concurrently without a
+thread per call. Blocking work still pushed to the loop's default executor is
+capped at ASYNC_EXECUTOR_WORKERS threads.
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Coroutine, Optional, TypeVar
+
+T = TypeVar("T")
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_lock = threading.Lock()
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """Return the shared loop, starting its thread on first use."""
+    global _loop
+    with _lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            workers = int(os.getenv("ASYNC_EXECUTOR_WORKERS", "16"))
+            loop.set_default_executor(ThreadPoolExecutor(max_workers=workers, thread_name_prefix="graph-exec"))
+            threading.Thread(target=loop.run_forever, name="graph-event-loop", daemon=True).start()
+            _loop = loop
+        return _loop
+
+
+def submit_async(coro: Coroutine[Any, Any, T]) -> "Future[T]":
+    """Schedule a coroutine on the shared loop and return a concurrent Future."""
+    return asyncio.run_coroutine_threadsafe(coro, get_loop())
+
+
+def run_async(coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+    """Run a coroutine on the shared loop and block the calling thread for its result."""
+    return submit_async(coro).result(timeout)
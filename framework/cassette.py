@@ -0,0 +1,195 @@
+"""Record and replay of LLM, MCP and prompt traffic.
+
+With CASSETTE_MODE=record every LLM completion, MCP tool call (and tool
+error), MCP tool manifest and Langfuse prompt fetched by the process is
+appended to CASSETTE_PATH as JSON lines. With CASSETTE_MODE=replay the same
+requests are answered from that file without touching the network, so a
+graph run can be reproduced and profiled offline:
+
+    CASSETTE_MODE=record python web_app.py        # exercise the habit graphs
+    CASSETTE_MODE=replay CASSETTE_LATENCY_SCALE=1 python -m benchmarks.run
+
+Requests are matched by the same keys used for request coalescing; identical
+requests are served in recorded order. Requests can also carry a looser
+fallback key (for LLM calls: graph node, model settings and message roles), so
+prompts that embed e.g. the current time still replay. CASSETTE_LATENCY_SCALE replays each
+response after its recorded duration times the scale (0, the default, answers
+immediately, measuring pure framework overhead). Streamed LLM calls are
+recorded as complete responses and replayed as a single chunk, so a recording
+made through the streaming chat also replays into plain invocations and vice
+versa. The LLM response cache is bypassed while a cassette is active, so every
+completion is recorded and replayed; MCP results served by the read cache are
+recorded as well.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+import warnings
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from langchain_core._api import LangChainBetaWarning
+from langchain_core.load import dumps, loads
+
+from framework.log_service import log
+
+CASSETTE_MODE_ENV = "CASSETTE_MODE"
+CASSETTE_PATH_ENV = "CASSETTE_PATH"
+CASSETTE_LATENCY_SCALE_ENV = "CASSETTE_LATENCY_SCALE"
+DEFAULT_PATH = "cassettes/cassette.jsonl"
+
+OFF = "off"
+RECORD = "record"
+REPLAY = "replay"
+
+
+class CassetteMiss(LookupError):
+    """A request made during replay that the cassette has no response for."""
+
+
+class Cassette:
+    """One cassette file in record or replay mode."""
+
+    def __init__(self, path: str, mode: str, latency_scale: float = 0.0):
+        self.path = path
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self._lock = threading.Lock()
+        self._file = None
+        # (kind, key) -> recorded entries not yet replayed, and the last one replayed for repeats
+        self._entries: Dict[Tuple[str, str], Deque[dict]] = defaultdict(deque)
+        self._fallback_entries: Dict[Tuple[str, str], Deque[dict]] = defaultdict(deque)
+        self._last: Dict[Tuple[str, str], dict] = {}
+        self._last_fallback: Dict[Tuple[str, str], dict] = {}
+        if mode == RECORD:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            self._file = open(path, "w", encoding="utf-8")
+        elif mode == REPLAY:
+            self._load()
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == RECORD
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == REPLAY
+
+    def _load(self) -> None:
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries[(entry["kind"], entry["key"])].append(entry)
+                    if entry.get("fallback_key"):
+                        self._fallback_entries[(entry["kind"], entry["fallback_key"])].append(entry)
+        log(f"[Cassette] Replaying {sum(map(len, self._entries.values()))} entries from {self.path}")
+
+    def record(
+        self,
+        kind: str,
+        key: str,
+        payload: Dict[str, Any],
+        duration: float = 0.0,
+        fallback_key: Optional[str] = None,
+    ) -> None:
+        entry = {"kind": kind, "key": key, "duration_ms": round(duration * 1000, 3), **payload}
+        if fallback_key:
+            entry["fallback_key"] = fallback_key
+        line = json.dumps(entry, default=repr)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def lookup(self, kind: str, key: str, fallback_key: Optional[str] = None) -> Optional[dict]:
+        """Next recorded entry for the request, or None if it was never recorded."""
+        with self._lock:
+            entries = self._entries.get((kind, key))
+            if not entries and fallback_key:
+                entries = self._fallback_entries.get((kind, fallback_key))
+            if not entries:
+                # Everything recorded for the request was served; repeat the last response
+                entry = self._last.get((kind, key))
+                if entry is None and fallback_key:
+                    entry = self._last_fallback.get((kind, fallback_key))
+                return entry
+            entry = entries.popleft()
+            # The entry is queued under both of its keys; consume it from both
+            _discard(self._entries[(kind, entry["key"])], entry)
+            self._last[(kind, entry["key"])] = entry
+            if entry.get("fallback_key"):
+                _discard(self._fallback_entries[(kind, entry["fallback_key"])], entry)
+                self._last_fallback[(kind, entry["fallback_key"])] = entry
+            return entry
+
+    def _require(self, kind: str, key: str, description: str, fallback_key: Optional[str]) -> dict:
+        entry = self.lookup(kind, key, fallback_key)
+        if entry is None:
+            raise CassetteMiss(f"No recorded {kind} response for {description} in {self.path}")
+        return entry
+
+    def _delay(self, entry: dict) -> float:
+        return entry.get("duration_ms", 0.0) / 1000 * self.latency_scale
+
+    def replay(self, kind: str, key: str, description: str, fallback_key: Optional[str] = None) -> dict:
+        entry = self._require(kind, key, description, fallback_key)
+        if self.latency_scale:
+            time.sleep(self._delay(entry))
+        return entry
+
+    async def areplay(self, kind: str, key: str, description: str, fallback_key: Optional[str] = None) -> dict:
+        entry = self._require(kind, key, description, fallback_key)
+        if self.latency_scale:
+            await asyncio.sleep(self._delay(entry))
+        return entry
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def _discard(entries: Deque[dict], entry: dict) -> None:
+    """Remove ``entry`` from ``entries`` by identity, if it is still queued there."""
+    for index, candidate in enumerate(entries):
+        if candidate is entry:
+            del entries[index]
+            return
+
+
+def encode(value: Any) -> str:
+    """Serialize LangChain objects (or plain JSON values) for a cassette entry."""
+    return dumps(value)
+
+
+def decode(value: str) -> Any:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", LangChainBetaWarning)
+        return loads(value, allowed_objects="core")
+
+
+_cassette: Optional[Cassette] = None
+_cassette_lock = threading.Lock()
+
+
+def get_cassette() -> Optional[Cassette]:
+    """The process-wide cassette from CASSETTE_MODE, or None when it is off."""
+    global _cassette
+    mode = os.getenv(CASSETTE_MODE_ENV, OFF).strip().lower()
+    if mode == OFF:
+        return None
+    with _cassette_lock:
+        if _cassette is None or _cassette.mode != mode:
+            if mode not in (RECORD, REPLAY):
+                raise ValueError(f"Unsupported {CASSETTE_MODE_ENV}: {mode}")
+            _cassette = Cassette(
+                os.getenv(CASSETTE_PATH_ENV, DEFAULT_PATH),
+                mode,
+                float(os.getenv(CASSETTE_LATENCY_SCALE_ENV, "0")),
+            )
+        return _cassette
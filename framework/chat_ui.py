@@ -7,13 +7,15 @@ from textual.app import App, ComposeResult
 from textual.containers import Container, Horizontal, Vertical
 from textual.widgets import (
     Header, Footer, Input, Button, Static, Select, 
-    RichLog, LoadingIndicator
+    RichLog, LoadingIndicator, DataTable
 )
 from textual.message import Message
 from textual.reactive import reactive
 
+from framework.async_runner import submit_async
 from framework.graph_registry import registry       
 from framework.graph_manager import invoke_graph
+from framework.metrics import node_summary
 
 
 class ChatMessage(Static):
@@ -45,6 +47,33 @@ class GraphSelector(Container):
         yield Select(options, id="graph_select")
 
 
+class MetricsPanel(Container):
+    """Table of per-node latency, LLM calls and tokens for graph runs in this session."""
+    
+    def compose(self) -> ComposeResult:
+        yield Static("Graph Metrics (ctrl+t to hide):", classes="label")
+        yield DataTable(id="metrics_table")
+    
+    def on_mount(self) -> None:
+        table = self.query_one("#metrics_table", DataTable)
+        table.add_columns("Graph", "Node", "Runs", "Mean (s)", "p95 (s)", "LLM calls", "Tokens")
+    
+    def refresh_metrics(self) -> None:
+        """Reload the table from the in-process metrics."""
+        table = self.query_one("#metrics_table", DataTable)
+        table.clear()
+        for row in node_summary():
+            table.add_row(
+                row["graph"],
+                row["node"],
+                str(row["runs"]),
+                f"{row['mean_seconds']:.2f}",
+                f"{row['p95_seconds']:.2f}",
+                str(row["llm_calls"]),
+                str(row["tokens"]),
+            )
+
+
 class ChatInterface(Container):
     """Main chat interface."""
     
@@ -134,13 +163,13 @@ class ChatInterface(Container):
             # Show thinking indicator
             chat_log.write("[dim]🤖 Assistant is thinking...[/dim]")
             
-            # Use the simplified graph_manager interface
-            response = await invoke_graph(
+            # Run on the shared loop, where the MCP sessions and HTTP pools live
+            response = await asyncio.wrap_future(submit_async(invoke_graph(
                 graph_name=self.current_graph,
                 message=message,
                 thread_id=self.current_thread_id,
                 is_new_thread=self.is_new_thread
-            )
+            )))
             
             # Mark that we're no longer in a new thread
             if self.is_new_thread:
@@ -151,6 +180,10 @@ class ChatInterface(Container):
             
         except Exception as e:
             chat_log.write(f"[bold red]Error:[/bold red] {str(e)}")
+        
+        metrics_panel = self.app.query_one(MetricsPanel)
+        if metrics_panel.display:
+            metrics_panel.refresh_metrics()
 
     
 class ChatUI(App):
@@ -209,6 +242,14 @@ class ChatUI(App):
         overflow-y: auto;
     }
     
+    /* Metrics table */
+    MetricsPanel {
+        height: auto;
+        max-height: 15;
+        display: none;
+        padding: 0 1;
+    }
+    
     /* New thread button */
     .new-thread-btn {
         width: 15;
@@ -222,13 +263,22 @@ class ChatUI(App):
     BINDINGS = [
         ("ctrl+c", "quit", "Quit"),
         ("ctrl+q", "quit", "Quit"),
+        ("ctrl+t", "toggle_metrics", "Metrics"),
     ]
     
     def compose(self) -> ComposeResult:
         yield Header()
         yield ChatInterface()
+        yield MetricsPanel()
         yield Footer()
     
+    def action_toggle_metrics(self) -> None:
+        """Show or hide the graph metrics table."""
+        metrics_panel = self.query_one(MetricsPanel)
+        metrics_panel.display = not metrics_panel.display
+        if metrics_panel.display:
+            metrics_panel.refresh_metrics()
+    
     def on_mount(self) -> None:
         """Called when app starts."""
         self.title = "LangGraph Chat Workshop"
@@ -0,0 +1,549 @@
+"""Pluggable checkpointer backends for compiled graphs."""
+
+import asyncio
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from langgraph.checkpoint.memory import MemorySaver
+
+from framework.log_service import log
+
+# Backend selection: "memory" (default), "bounded" or "sqlite"
+CHECKPOINTER_BACKEND_ENV = "CHECKPOINTER_BACKEND"
+SQLITE_PATH_ENV = "CHECKPOINTER_SQLITE_PATH"
+SQLITE_BATCH_SIZE_ENV = "CHECKPOINTER_SQLITE_BATCH_SIZE"
+MAX_THREADS_ENV = "CHECKPOINTER_MAX_THREADS"
+MAX_BYTES_ENV = "CHECKPOINTER_MAX_BYTES"
+THREAD_TTL_ENV = "CHECKPOINTER_THREAD_TTL"
+
+DEFAULT_SQLITE_PATH = "checkpoints.db"
+DEFAULT_SQLITE_BATCH_SIZE = 64
+DEFAULT_MAX_THREADS = 1000
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    namespace TEXT NOT NULL,
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    checkpoint_type TEXT NOT NULL,
+    checkpoint BLOB NOT NULL,
+    metadata_type TEXT NOT NULL,
+    metadata BLOB NOT NULL,
+    PRIMARY KEY (namespace, thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    namespace TEXT NOT NULL,
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    value_type TEXT NOT NULL,
+    value BLOB NOT NULL,
+    task_path TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (namespace, thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+"""
+
+
+class SQLiteCheckpointSaver(BaseCheckpointSaver[str]):
+    """On-disk checkpointer backed by a SQLite database in WAL mode.
+
+    Pending writes are buffered and flushed in a single transaction when the next
+    checkpoint is saved, when the buffer reaches ``batch_size``, or before any read.
+    Several processes can share one database file; ``namespace`` (usually the graph
+    name) keeps threads of different graphs apart.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_SQLITE_PATH,
+        namespace: str = "",
+        batch_size: int = DEFAULT_SQLITE_BATCH_SIZE,
+        **kwargs: Any,
+    ):
+        super().__init__(**kwargs)
+        self.path = path
+        self.namespace = namespace
+        self.batch_size = max(1, batch_size)
+        self._lock = threading.RLock()
+        self._pending_writes: List[Tuple] = []
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # WAL + NORMAL only fsyncs on checkpoint of the WAL, not every commit
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    # ------------------------------------------------------------------
+    # Write buffering
+    # ------------------------------------------------------------------
+
+    def _flush_locked(self) -> None:
+        if not self._pending_writes:
+            return
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            self._pending_writes,
+        )
+        self._pending_writes.clear()
+
+    def flush(self) -> None:
+        """Persist any buffered writes."""
+        with self._lock:
+            self._flush_locked()
+            self._conn.commit()
+
+    def close(self) -> None:
+        """Flush buffered writes and close the database connection."""
+        with self._lock:
+            self._flush_locked()
+            self._conn.commit()
+            self._conn.close()
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def _load_writes(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> List[Tuple[str, str, Any]]:
+        rows = self._conn.execute(
+            "SELECT task_id, channel, value_type, value FROM writes "
+            "WHERE namespace = ? AND thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? "
+            "ORDER BY task_path, task_id, idx",
+            (self.namespace, thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+        return [
+            (task_id, channel, self.serde.loads_typed((value_type, value)))
+            for task_id, channel, value_type, value in rows
+        ]
+
+    def _row_to_tuple(self, thread_id: str, checkpoint_ns: str, row: Tuple) -> CheckpointTuple:
+        checkpoint_id, parent_checkpoint_id, checkpoint_type, checkpoint, metadata_type, metadata = row
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint=self.serde.loads_typed((checkpoint_type, checkpoint)),
+            metadata=self.serde.loads_typed((metadata_type, metadata)),
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_checkpoint_id,
+                    }
+                }
+                if parent_checkpoint_id
+                else None
+            ),
+            pending_writes=self._load_writes(thread_id, checkpoint_ns, checkpoint_id),
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """Get the requested (or latest) checkpoint tuple for a thread."""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        columns = "checkpoint_id, parent_checkpoint_id, checkpoint_type, checkpoint, metadata_type, metadata"
+        with self._lock:
+            self._flush_locked()
+            if checkpoint_id := get_checkpoint_id(config):
+                row = self._conn.execute(
+                    f"SELECT {columns} FROM checkpoints "
+                    "WHERE namespace = ? AND thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    (self.namespace, thread_id, checkpoint_ns, checkpoint_id),
+                ).fetchone()
+            else:
+                row = self._conn.execute(
+                    f"SELECT {columns} FROM checkpoints "
+                    "WHERE namespace = ? AND thread_id = ? AND checkpoint_ns = ? "
+                    "ORDER BY checkpoint_id DESC LIMIT 1",
+                    (self.namespace, thread_id, checkpoint_ns),
+                ).fetchone()
+            if not row:
+                return None
+            return self._row_to_tuple(thread_id, checkpoint_ns, row)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        """List checkpoints, newest first, matching the given criteria."""
+        query = (
+            "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, "
+            "checkpoint_type, checkpoint, metadata_type, metadata FROM checkpoints WHERE namespace = ?"
+        )
+        params: List[Any] = [self.namespace]
+        if config:
+            query += " AND thread_id = ?"
+            params.append(config["configurable"]["thread_id"])
+            if (checkpoint_ns := config["configurable"].get("checkpoint_ns")) is not None:
+                query += " AND checkpoint_ns = ?"
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                query += " AND checkpoint_id = ?"
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            query += " AND checkpoint_id < ?"
+            params.append(before_id)
+        query += " ORDER BY checkpoint_id DESC"
+
+        with self._lock:
+            self._flush_locked()
+            rows = self._conn.execute(query, params).fetchall()
+            results = []
+            for row in rows:
+                if limit is not None and len(results) >= limit:
+                    break
+                thread_id, checkpoint_ns = row[0], row[1]
+                checkpoint_tuple = self._row_to_tuple(thread_id, checkpoint_ns, row[2:])
+                if filter and not all(
+                    value == checkpoint_tuple.metadata.get(key) for key, value in filter.items()
+                ):
+                    continue
+                results.append(checkpoint_tuple)
+        yield from results
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """Save a checkpoint together with any buffered writes in one transaction."""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_type, checkpoint_blob = self.serde.dumps_typed(checkpoint)
+        metadata_type, metadata_blob = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+        with self._lock:
+            self._flush_locked()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    self.namespace,
+                    thread_id,
+                    checkpoint_ns,
+                    checkpoint["id"],
+                    config["configurable"].get("checkpoint_id"),  # parent
+                    checkpoint_type,
+                    checkpoint_blob,
+                    metadata_type,
+                    metadata_blob,
+                ),
+            )
+            self._conn.commit()
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        """Buffer intermediate writes; they are flushed with the next checkpoint."""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        rows = []
+        for idx, (channel, value) in enumerate(writes):
+            value_type, value_blob = self.serde.dumps_typed(value)
+            rows.append((
+                self.namespace,
+                thread_id,
+                checkpoint_ns,
+                checkpoint_id,
+                task_id,
+                WRITES_IDX_MAP.get(channel, idx),
+                channel,
+                value_type,
+                value_blob,
+                task_path,
+            ))
+        with self._lock:
+            self._pending_writes.extend(rows)
+            if len(self._pending_writes) >= self.batch_size:
+                self._flush_locked()
+                self._conn.commit()
+
+    def delete_thread(self, thread_id: str) -> None:
+        """Delete all checkpoints and writes for a thread."""
+        with self._lock:
+            self._pending_writes = [w for w in self._pending_writes if w[1] != thread_id]
+            self._conn.execute(
+                "DELETE FROM checkpoints WHERE namespace = ? AND thread_id = ?",
+                (self.namespace, thread_id),
+            )
+            self._conn.execute(
+                "DELETE FROM writes WHERE namespace = ? AND thread_id = ?",
+                (self.namespace, thread_id),
+            )
+            self._conn.commit()
+
+    # ------------------------------------------------------------------
+    # Async variants run the blocking SQLite calls off the event loop
+    # ------------------------------------------------------------------
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ):
+        items = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        # put_writes may flush the buffer to disk, so keep it off the event loop
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+    def get_next_version(self, current: Optional[str], channel: None) -> str:
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+
+class BoundedMemorySaver(MemorySaver):
+    """In-memory checkpointer that evicts whole threads to stay within its limits.
+
+    Threads are evicted least-recently-used first once ``max_threads`` or
+    ``max_bytes`` (serialized size) is exceeded, and any thread idle for longer
+    than ``ttl_seconds`` is dropped. A limit of ``None`` disables that check.
+    """
+
+    def __init__(
+        self,
+        max_threads: Optional[int] = DEFAULT_MAX_THREADS,
+        max_bytes: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        **kwargs: Any,
+    ):
+        super().__init__(**kwargs)
+        self.max_threads = max_threads
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.RLock()
+        # thread_id -> last access time, least recently used first
+        self._last_access: "OrderedDict[str, float]" = OrderedDict()
+        self._thread_bytes: Dict[str, int] = {}
+        self._write_bytes: Dict[Tuple[str, str, str], int] = {}
+        self.total_bytes = 0
+        self.evictions = {"lru": 0, "bytes": 0, "ttl": 0}
+
+    def _touch(self, thread_id: str) -> None:
+        self._last_access[thread_id] = time.monotonic()
+        self._last_access.move_to_end(thread_id)
+
+    def _add_bytes(self, thread_id: str, size: int) -> None:
+        self._thread_bytes[thread_id] = self._thread_bytes.get(thread_id, 0) + size
+        self.total_bytes += size
+
+    def _evict(self, thread_id: str, reason: str) -> None:
+        super().delete_thread(thread_id)
+        self._forget(thread_id)
+        self.evictions[reason] += 1
+        log(f"[Checkpointer] Evicted thread {thread_id} ({reason})")
+
+    def _forget(self, thread_id: str) -> None:
+        self._last_access.pop(thread_id, None)
+        self.total_bytes -= self._thread_bytes.pop(thread_id, 0)
+        for key in [k for k in self._write_bytes if k[0] == thread_id]:
+            del self._write_bytes[key]
+
+    def _enforce_limits(self, keep: str) -> None:
+        """Evict idle and least-recently-used threads, never the one in use."""
+        if self.ttl_seconds is not None:
+            cutoff = time.monotonic() - self.ttl_seconds
+            for thread_id, last_access in list(self._last_access.items()):
+                if last_access >= cutoff:
+                    break
+                if thread_id != keep:
+                    self._evict(thread_id, "ttl")
+
+        while self.max_threads is not None and len(self._last_access) > self.max_threads:
+            oldest = next(iter(self._last_access))
+            if oldest == keep:
+                break
+            self._evict(oldest, "lru")
+
+        while self.max_bytes is not None and self.total_bytes > self.max_bytes:
+            oldest = next(iter(self._last_access))
+            if oldest == keep:
+                break
+            self._evict(oldest, "bytes")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return current usage and eviction counters."""
+        with self._lock:
+            return {
+                "threads": len(self._last_access),
+                "bytes": self.total_bytes,
+                "evictions": dict(self.evictions),
+            }
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        with self._lock:
+            if thread_id not in self._last_access:
+                # Avoid the defaultdict in MemorySaver creating empty entries for unknown threads
+                return None
+            self._touch(thread_id)
+            return super().get_tuple(config)
+
+    def list(self, config: Optional[RunnableConfig], **kwargs: Any) -> Iterator[CheckpointTuple]:
+        with self._lock:
+            if config and config["configurable"]["thread_id"] not in self._last_access:
+                return iter(())
+            return iter(list(super().list(config, **kwargs)))
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        with self._lock:
+            result = super().put(config, checkpoint, metadata, new_versions)
+            size = sum(
+                len(self.blobs[(thread_id, checkpoint_ns, channel, version)][1])
+                for channel, version in new_versions.items()
+            )
+            saved, saved_metadata, _ = self.storage[thread_id][checkpoint_ns][checkpoint["id"]]
+            size += len(saved[1]) + len(saved_metadata[1])
+            self._add_bytes(thread_id, size)
+            self._touch(thread_id)
+            self._enforce_limits(keep=thread_id)
+            return result
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        key = (
+            thread_id,
+            config["configurable"].get("checkpoint_ns", ""),
+            config["configurable"]["checkpoint_id"],
+        )
+        with self._lock:
+            super().put_writes(config, writes, task_id, task_path)
+            size = sum(len(write[2][1]) for write in self.writes.get(key, {}).values())
+            self._add_bytes(thread_id, size - self._write_bytes.get(key, 0))
+            self._write_bytes[key] = size
+            self._touch(thread_id)
+            self._enforce_limits(keep=thread_id)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            super().delete_thread(thread_id)
+            self._forget(thread_id)
+
+
+def _optional_int(env_var: str, default: Optional[int] = None) -> Optional[int]:
+    value = os.getenv(env_var)
+    if value is None or value.strip() == "":
+        return default
+    number = int(value)
+    return number if number > 0 else None
+
+
+def create_checkpointer(graph_name: str) -> BaseCheckpointSaver:
+    """Create the checkpointer for a graph based on the CHECKPOINTER_BACKEND env var."""
+    backend = os.getenv(CHECKPOINTER_BACKEND_ENV, "memory").strip().lower()
+
+    if backend == "sqlite":
+        path = os.getenv(SQLITE_PATH_ENV, DEFAULT_SQLITE_PATH)
+        batch_size = int(os.getenv(SQLITE_BATCH_SIZE_ENV, DEFAULT_SQLITE_BATCH_SIZE))
+        log(f"[Checkpointer] Using SQLite checkpointer at {path} for '{graph_name}'")
+        return SQLiteCheckpointSaver(path=path, namespace=graph_name, batch_size=batch_size)
+
+    if backend == "bounded":
+        max_threads = _optional_int(MAX_THREADS_ENV, DEFAULT_MAX_THREADS)
+        max_bytes = _optional_int(MAX_BYTES_ENV)
+        ttl_seconds = _optional_int(THREAD_TTL_ENV)
+        log(
+            f"[Checkpointer] Using bounded memory checkpointer for '{graph_name}' "
+            f"(max_threads={max_threads}, max_bytes={max_bytes}, ttl={ttl_seconds})"
+        )
+        return BoundedMemorySaver(max_threads=max_threads, max_bytes=max_bytes, ttl_seconds=ttl_seconds)
+
+    if backend != "memory":
+        log(f"Warning: Unknown checkpointer backend '{backend}', falling back to memory")
+    return MemorySaver()
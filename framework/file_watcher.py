@@ -0,0 +1,106 @@
+"""Polling file watcher.
+
+Checks the modification time and size of watched files on a daemon thread and
+calls back with the paths that changed, were added or were removed. Polling
+keeps it dependency-free and works the same on bind mounts and network drives
+where inotify-style events are unreliable.
+"""
+
+import fnmatch
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from framework.log_service import log
+
+Snapshot = Dict[str, Tuple[int, int]]
+
+
+class _Watch:
+    def __init__(self, path: str, pattern: Optional[str], callback: Callable[[List[str]], None]):
+        self.path = os.path.abspath(path)
+        self.pattern = pattern
+        self.callback = callback
+        self.snapshot = self.scan()
+
+    def scan(self) -> Snapshot:
+        """(mtime_ns, size) of the watched file, or of matching files under a directory."""
+        if not os.path.isdir(self.path):
+            return _stat(self.path)
+        snapshot: Snapshot = {}
+        for root, dirs, files in os.walk(self.path):
+            dirs[:] = [d for d in dirs if not d.startswith((".", "__pycache__"))]
+            for file_name in files:
+                if self.pattern is None or fnmatch.fnmatch(file_name, self.pattern):
+                    snapshot.update(_stat(os.path.join(root, file_name)))
+        return snapshot
+
+
+def _stat(path: str) -> Snapshot:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return {}
+    return {path: (stat.st_mtime_ns, stat.st_size)}
+
+
+class FileWatcher:
+    """Polls watched paths every ``interval`` seconds."""
+
+    def __init__(self, interval: float = 2.0):
+        self.interval = interval
+        self._watches: List[_Watch] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def watch(self, path: str, callback: Callable[[List[str]], None], pattern: Optional[str] = None) -> None:
+        """Call ``callback(changed_paths)`` when ``path`` (or files matching ``pattern`` under it) changes."""
+        with self._lock:
+            self._watches.append(_Watch(path, pattern, callback))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="file-watcher", daemon=True)
+                self._thread.start()
+
+    def unwatch(self, path: str) -> None:
+        path = os.path.abspath(path)
+        with self._lock:
+            self._watches = [w for w in self._watches if w.path != path]
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def poll(self) -> None:
+        """Check every watched path once and run callbacks for the changed ones."""
+        with self._lock:
+            watches = list(self._watches)
+        for watch in watches:
+            snapshot = watch.scan()
+            if snapshot == watch.snapshot:
+                continue
+            changed = sorted(
+                path for path in snapshot.keys() | watch.snapshot.keys()
+                if snapshot.get(path) != watch.snapshot.get(path)
+            )
+            watch.snapshot = snapshot
+            try:
+                watch.callback(changed)
+            except Exception as e:
+                log(f"[Watcher] Callback for {watch.path} failed: {e}")
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.poll()
+
+
+_watcher: Optional[FileWatcher] = None
+_watcher_lock = threading.Lock()
+
+
+def get_file_watcher() -> FileWatcher:
+    """Process-wide watcher polling every FILE_WATCH_INTERVAL_SECONDS."""
+    global _watcher
+    with _watcher_lock:
+        if _watcher is None:
+            _watcher = FileWatcher(float(os.getenv("FILE_WATCH_INTERVAL_SECONDS", "2")))
+        return _watcher
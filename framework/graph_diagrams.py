@@ -0,0 +1,150 @@
+"""Mermaid diagram generation for registered graphs, kept off the compile hot path.
+
+Diagrams are written next to each graph module as ``{name}_diagram.mmd`` (always,
+rendered locally) and ``{name}_diagram.png`` (remote render via mermaid.ink).
+The ``.mmd`` file records a hash of the graph topology, so unchanged graphs are
+never re-rendered.
+
+Usage:
+    python -m framework.graph_diagrams                # all graphs
+    python -m framework.graph_diagrams 01-linear      # selected graphs
+    python -m framework.graph_diagrams --offline      # only write .mmd sources
+"""
+
+import argparse
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+
+from framework.graph_registry import registry
+from framework.log_service import log
+
+# When to render diagrams after a graph is compiled: "off" (default), "background" or "sync"
+DIAGRAMS_MODE_ENV = "GRAPH_DIAGRAMS"
+# Set to "false" to skip the remote PNG render and only write .mmd sources
+DIAGRAMS_PNG_ENV = "GRAPH_DIAGRAMS_PNG"
+
+_HASH_PREFIX = "%% topology-hash: "
+
+# Single worker so background renders never compete with request handling
+_executor: Optional[ThreadPoolExecutor] = None
+# Graphs are compiled from several warm-up threads at once
+_executor_lock = threading.Lock()
+
+
+def get_diagram_dir(graph_name: str) -> Optional[Path]:
+    """Return the directory of the module that defines a graph."""
+    graph_info = registry.get_graph_info(graph_name)
+    if not graph_info:
+        return None
+
+    module_parts = graph_info.module_path.split('.')
+    if len(module_parts) >= 3:  # graphs.folder.filename
+        return Path(__file__).parent.parent / "graphs" / module_parts[1]
+    return Path(__file__).parent.parent / "graphs"  # graphs.filename
+
+
+def _read_saved_hash(mmd_path: Path) -> Optional[str]:
+    try:
+        with open(mmd_path, 'r', encoding='utf-8') as f:
+            first_line = f.readline().strip()
+    except OSError:
+        return None
+    if first_line.startswith(_HASH_PREFIX):
+        return first_line[len(_HASH_PREFIX):]
+    return None
+
+
+def save_graph_diagram(graph_name: str, compiled_graph, render_png: bool = True) -> bool:
+    """Write the graph's Mermaid source and PNG unless the topology is unchanged.
+
+    Returns True if any file was written.
+    """
+    try:
+        graph_dir = get_diagram_dir(graph_name)
+        if not graph_dir:
+            log(f"Warning: Could not find graph info for '{graph_name}'")
+            return False
+
+        drawable = compiled_graph.get_graph()
+        mermaid_source = drawable.draw_mermaid()
+        topology_hash = hashlib.sha256(mermaid_source.encode('utf-8')).hexdigest()[:16]
+
+        mmd_path = graph_dir / f"{graph_name}_diagram.mmd"
+        png_path = graph_dir / f"{graph_name}_diagram.png"
+
+        unchanged = _read_saved_hash(mmd_path) == topology_hash
+        if unchanged and (png_path.exists() or not render_png):
+            return False
+
+        if not unchanged:
+            with open(mmd_path, 'w', encoding='utf-8') as f:
+                f.write(f"{_HASH_PREFIX}{topology_hash}\n{mermaid_source}")
+            log(f"Graph diagram source saved to: {mmd_path}")
+
+        if render_png:
+            try:
+                png_data = drawable.draw_mermaid_png()
+            except Exception as e:
+                # Offline hosts keep the .mmd source, which renders in most Markdown viewers
+                log(f"Warning: Could not render PNG for graph '{graph_name}', kept {mmd_path.name}: {e}")
+            else:
+                with open(png_path, 'wb') as f:
+                    f.write(png_data)
+                log(f"Graph diagram saved to: {png_path}")
+        return True
+
+    except Exception as e:
+        log(f"Warning: Could not save diagram for graph '{graph_name}': {e}")
+        return False
+
+
+def schedule_graph_diagram(graph_name: str, compiled_graph) -> None:
+    """Render a diagram after compile according to the GRAPH_DIAGRAMS setting."""
+    global _executor
+    mode = os.getenv(DIAGRAMS_MODE_ENV, "off").strip().lower()
+    render_png = os.getenv(DIAGRAMS_PNG_ENV, "true").strip().lower() != "false"
+
+    if mode == "sync":
+        save_graph_diagram(graph_name, compiled_graph, render_png)
+    elif mode == "background":
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="graph-diagrams")
+        _executor.submit(save_graph_diagram, graph_name, compiled_graph, render_png)
+
+
+def render_diagrams(names: Optional[List[str]] = None, render_png: bool = True) -> None:
+    """Build and render diagrams for the given graphs (all registered graphs by default)."""
+    names = names or sorted(info.name for info in registry.list_graphs())
+    for name in names:
+        build_function = registry.get_build_function(name)
+        if not build_function:
+            print(f"Unknown graph '{name}'")
+            continue
+        try:
+            graph = build_function()
+            written = save_graph_diagram(name, graph.compile(), render_png)
+        except Exception as e:
+            print(f"Error rendering diagram for '{name}': {e}")
+            continue
+        print(f"{name}: {'updated' if written else 'unchanged'}")
+
+
+def main() -> None:
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Render Mermaid diagrams for registered graphs.")
+    parser.add_argument("graphs", nargs="*", help="Graph names to render (default: all)")
+    parser.add_argument("--offline", action="store_true", help="Only write .mmd sources, skip the PNG render")
+    args = parser.parse_args()
+
+    load_dotenv()
+    render_diagrams(args.graphs, render_png=not args.offline)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,43 +1,78 @@
-from pathlib import Path
-from typing import Dict, Optional
+import asyncio
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Sequence, Set, Tuple
 from langgraph.graph import StateGraph
-from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langfuse.langchain import CallbackHandler
 
+from framework.checkpointers import create_checkpointer
+from framework.file_watcher import get_file_watcher
 from framework.graph_registry import registry
+from framework.history import NOSTREAM_TAG
+from framework.log_service import log
+from framework.mcp_registry import on_mcp_tools_changed, track_mcp_servers
+from framework.metrics import MetricsCallbackHandler
+from framework.usage_ledger import UsageLedgerCallbackHandler, ledger_enabled
 
 # Cache for compiled graphs
 _compiled_graphs: Dict[str, StateGraph] = {}
 
+# Checkpointers are kept separately so a graph can be recompiled without losing threads
+_checkpointers: Dict[str, BaseCheckpointSaver] = {}
 
-def _save_graph_diagram(graph_name: str, compiled_graph: StateGraph) -> None:
-    """Save a Mermaid PNG diagram of the graph to its directory."""
-    try:
-        # Get graph info to find the module path
-        graph_info = registry.get_graph_info(graph_name)
-        if not graph_info:
-            print(f"Warning: Could not find graph info for '{graph_name}'")
-            return
-        
-        # Determine the directory where the graph file is located
-        module_parts = graph_info.module_path.split('.')
-        if len(module_parts) >= 3:  # graphs.folder.filename
-            graph_dir = Path(__file__).parent.parent / "graphs" / module_parts[1]
-        else:  # graphs.filename
-            graph_dir = Path(__file__).parent.parent / "graphs"
-        
-        # Create the diagram file path
-        diagram_path = graph_dir / f"{graph_name}_diagram.png"
-        
-        # Generate and save the Mermaid diagram
-        png_data = compiled_graph.get_graph().draw_mermaid_png()
-        with open(diagram_path, 'wb') as f:
-            f.write(png_data)
-        
-        print(f"Graph diagram saved to: {diagram_path}")
-        
-    except Exception as e:
-        print(f"Warning: Could not save diagram for graph '{graph_name}': {e}")
+# MCP servers whose tools each compiled graph was built with
+_graph_mcp_servers: Dict[str, Set[str]] = {}
+
+# Per-graph locks so concurrent requests/warm-up never build the same graph twice
+_compile_locks: Dict[str, threading.Lock] = {}
+_compile_locks_guard = threading.Lock()
+
+
+def get_checkpointer(name: str) -> BaseCheckpointSaver:
+    """Return the checkpointer for a graph, creating it from the configured backend."""
+    if name not in _checkpointers:
+        _checkpointers[name] = create_checkpointer(name)
+    return _checkpointers[name]
+
+
+def _get_compile_lock(name: str) -> threading.Lock:
+    with _compile_locks_guard:
+        if name not in _compile_locks:
+            _compile_locks[name] = threading.Lock()
+        return _compile_locks[name]
+
+
+def _build_compiled_graph(name: str):
+    """Build, compile and cache a graph, raising on failure."""
+    from framework.graph_diagrams import schedule_graph_diagram
+    
+    # Get the build function from registry
+    build_function = registry.get_build_function(name)
+    if not build_function:
+        raise ValueError(f"Graph '{name}' is not registered")
+    
+    # Build the graph, noting which MCP servers' tools it captures
+    with track_mcp_servers() as mcp_servers:
+        graph = build_function()
+    if graph is None:
+        raise ValueError(f"Build function for '{name}' returned no graph")
+    # Reuse (or create) the persistent checkpointer for this graph
+    checkpointer = get_checkpointer(name)
+    # Compile the graph with the checkpointer
+    compiled_graph = graph.compile(checkpointer=checkpointer)
+    # Cache the compiled graph
+    _compiled_graphs[name] = compiled_graph
+    _graph_mcp_servers[name] = mcp_servers
+    
+    # Render the diagram off the hot path (opt-in via GRAPH_DIAGRAMS)
+    schedule_graph_diagram(name, compiled_graph)
+    
+    return compiled_graph
 
 
 def get_compiled_graph(name: str) -> Optional[StateGraph]:
@@ -47,38 +82,146 @@ def get_compiled_graph(name: str) -> Optional[StateGraph]:
     if name in _compiled_graphs:
         return _compiled_graphs[name]
     
-    # Get the build function from registry
-    build_function = registry.get_build_function(name)
-    if not build_function:
+    if not registry.get_build_function(name):
         return None
     
+    # Only one thread builds a given graph; the others wait and reuse it
+    with _get_compile_lock(name):
+        if name in _compiled_graphs:
+            return _compiled_graphs[name]
+        try:
+            return _build_compiled_graph(name)
+        except Exception as e:
+            print(f"Error building graph '{name}': {e}")
+            return None
+
+
+def rebuild_graphs(names: Iterable[str]) -> None:
+    """Recompile graphs in the background, swapping each in once it is built.
+
+    Requests keep using the previous compiled graph until then; checkpointers
+    are reused, so existing threads carry on.
+    """
+    def rebuild(name: str) -> None:
+        with _get_compile_lock(name):
+            try:
+                _build_compiled_graph(name)
+                log(f"[Graphs] Rebuilt '{name}'")
+            except Exception as e:
+                # Drop the stale graph so the next request retries the build
+                _compiled_graphs.pop(name, None)
+                log(f"[Graphs] Rebuilding '{name}' failed: {e}")
+
+    for name in names:
+        threading.Thread(target=rebuild, args=(name,), name=f"graph-rebuild-{name}", daemon=True).start()
+
+
+def _on_mcp_tools_changed(server_names: Set[str]) -> None:
+    affected = sorted(name for name, servers in _graph_mcp_servers.items() if servers & server_names)
+    if affected:
+        log(f"[Graphs] MCP servers {', '.join(sorted(server_names))} changed; rebuilding {', '.join(affected)}")
+        rebuild_graphs(affected)
+
+
+on_mcp_tools_changed(_on_mcp_tools_changed)
+
+
+def _graph_watch_enabled() -> bool:
+    return os.getenv("GRAPH_WATCH", "off").strip().lower() in ("1", "true", "yes", "on")
+
+
+def _on_graph_files_changed(paths: List[str]) -> None:
+    # Runs on the watcher thread; graphs that were never compiled load the new code on first use
+    names = registry.reload_files(paths)
+    for name in sorted(names):
+        if registry.get_graph_info(name) is None:
+            with _get_compile_lock(name):
+                _compiled_graphs.pop(name, None)
+                _graph_mcp_servers.pop(name, None)
+            log(f"[Graphs] '{name}' was removed")
+    affected = sorted(name for name in names if name in _compiled_graphs)
+    if affected:
+        rebuild_graphs(affected)
+
+
+def watch_graph_files() -> None:
+    """Reload edited graph modules and rebuild only their compiled graphs (opt-in via GRAPH_WATCH)."""
+    if not _graph_watch_enabled():
+        return
+    graphs_dir = str(registry.graphs_dir)
+    watcher = get_file_watcher()
+    watcher.unwatch(graphs_dir)
+    watcher.watch(graphs_dir, _on_graph_files_changed, pattern="*.py")
+    log(f"[Graphs] Watching {graphs_dir} for changes")
+
+
+@dataclass
+class WarmupResult:
+    """Outcome of precompiling one graph."""
+    name: str
+    success: bool
+    seconds: float
+    error: Optional[str] = None
+
+
+def _warm_up_graph(name: str) -> WarmupResult:
+    start = time.perf_counter()
     try:
-        # Build the graph
-        graph = build_function()
-        # Create a persistent checkpointer for this graph
-        checkpointer = MemorySaver()
-        # Compile the graph with the checkpointer
-        compiled_graph = graph.compile(checkpointer=checkpointer)
-        # Cache the compiled graph
-        _compiled_graphs[name] = compiled_graph
-        
-        # Save the graph diagram
-        _save_graph_diagram(name, compiled_graph)
-        
-        return compiled_graph
-        
+        with _get_compile_lock(name):
+            if name not in _compiled_graphs:
+                _build_compiled_graph(name)
+        return WarmupResult(name, True, time.perf_counter() - start)
     except Exception as e:
-        print(f"Error building graph '{name}': {e}")
-        return None
+        return WarmupResult(name, False, time.perf_counter() - start, str(e))
 
 
-async def invoke_graph(
+def warm_up_graphs(names: Optional[List[str]] = None, max_workers: Optional[int] = None) -> List[WarmupResult]:
+    """Build and compile graphs concurrently so first requests skip the cold start.
+    
+    Compiles every registered graph unless ``names`` is given. Failures are
+    reported in the results instead of stopping the remaining graphs.
+    """
+    # Discovery imports modules and is not thread-safe, so do it up front
+    available = [info.name for info in registry.list_graphs()]
+    names = names or sorted(available)
+    
+    results: Dict[str, WarmupResult] = {}
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="graph-warmup") as executor:
+        futures = {}
+        for name in names:
+            if name not in available:
+                results[name] = WarmupResult(name, False, 0.0, "not registered")
+                continue
+            futures[executor.submit(_warm_up_graph, name)] = name
+        for future in as_completed(futures):
+            result = future.result()
+            results[result.name] = result
+            log(f"[Warmup] {result.name}: {'ok' if result.success else 'failed'} in {result.seconds:.2f}s"
+                + (f" ({result.error})" if result.error else ""))
+    
+    return [results[name] for name in names]
+
+
+def format_warmup_report(results: List[WarmupResult]) -> str:
+    """Format warm-up results as a small table."""
+    width = max([len(r.name) for r in results] + [5])
+    lines = [f"{'Graph':<{width}}  {'Status':<6}  {'Time':>7}"]
+    for r in results:
+        status = "ok" if r.success else "FAILED"
+        line = f"{r.name:<{width}}  {status:<6}  {r.seconds:>6.2f}s"
+        if r.error:
+            line += f"  {r.error}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+async def _prepare_invocation(
     graph_name: str,
     message: str,
-    thread_id: Optional[str] = None,
-    is_new_thread: bool = False,
-) -> str:
-    """Invoke a graph with message handling and state management."""
+    thread_id: Optional[str],
+    is_new_thread: bool,
+) -> Tuple[StateGraph, Dict[str, Any], Dict[str, Any]]:
+    """Resolve the compiled graph and build its input and config for one user message."""
     from langchain_core.messages import HumanMessage
     
     # Get the compiled graph
@@ -91,6 +234,26 @@ async def invoke_graph(
     if not graph_module:
         raise ValueError(f"Could not load graph module '{graph_name}'")
     
+    # Setup Langfuse tracking, in-process metrics and the usage ledger
+    callbacks = [CallbackHandler(), MetricsCallbackHandler(graph_name)]
+    if ledger_enabled():
+        callbacks.append(UsageLedgerCallbackHandler(graph_name, thread_id))
+    config = {
+        "callbacks": callbacks,
+        "configurable": {
+            "thread_id": thread_id,
+        },
+        # Lets nodes key per-thread state by graph (e.g. history summaries)
+        "metadata": {"graph": graph_name},
+        "recursion_limit": 100
+    }
+    
+    # A bounded checkpointer may have evicted an idle thread; start it over
+    if not is_new_thread:
+        state = await graph.aget_state(config)
+        if not state.values:
+            is_new_thread = True
+    
     # Prepare input based on whether this is a new thread
     if is_new_thread:
         # First message: initialize with system prompt + user message
@@ -104,22 +267,136 @@ async def invoke_graph(
             "messages": [HumanMessage(content=message)]
         }
     
-    # Setup Langfuse tracking
-    langfuse_handler = CallbackHandler()
-    config = {
-        "callbacks": [langfuse_handler],
-        "configurable": {
-            "thread_id": thread_id,
-        },
-        "recursion_limit": 100
-    }
+    return graph, input_data, config
+
+
+def _final_response(values: Dict[str, Any]) -> str:
+    """Extract the response text from the graph's final state."""
+    response_messages = values.get("messages", [])
+    if response_messages:
+        return response_messages[-1].content
+    else:
+        return "No response generated"
+
+
+async def invoke_graph(
+    graph_name: str,
+    message: str,
+    thread_id: Optional[str] = None,
+    is_new_thread: bool = False,
+) -> str:
+    """Invoke a graph with message handling and state management."""
+    graph, input_data, config = await _prepare_invocation(graph_name, message, thread_id, is_new_thread)
     
     # Invoke the graph
     result = await graph.ainvoke(input_data, config)
     
     # Extract and return the response message
-    response_messages = result.get("messages", [])
-    if response_messages:
-        return response_messages[-1].content
-    else:
-        return "No response generated"
\ No newline at end of file
+    return _final_response(result)
+
+
+@dataclass
+class BatchResult:
+    """Outcome of one item in a batch invocation."""
+    thread_id: str
+    response: Optional[str] = None
+    error: Optional[Exception] = None
+    
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+async def invoke_graph_batch(
+    graph_name: str,
+    items: Sequence[Tuple[str, Optional[str]]],
+    max_concurrency: int = 8,
+) -> List[BatchResult]:
+    """Run many (message, thread_id) pairs through a graph concurrently.
+    
+    Items without a thread_id get a fresh thread. Results are returned in input
+    order; a failing item carries its exception instead of aborting the batch.
+    Items that reuse a thread_id run in later waves so each thread sees its
+    messages in order.
+    """
+    # Group items into waves where every thread appears at most once
+    waves: List[List[int]] = []
+    thread_ids: List[str] = []
+    seen: Dict[str, int] = {}
+    for index, (_, thread_id) in enumerate(items):
+        thread_id = thread_id or str(uuid.uuid4())
+        thread_ids.append(thread_id)
+        wave = seen.get(thread_id, 0)
+        seen[thread_id] = wave + 1
+        if wave == len(waves):
+            waves.append([])
+        waves[wave].append(index)
+    
+    results: List[Optional[BatchResult]] = [None] * len(items)
+    # Bounds the whole batch; max_concurrency in a run's config would also cap
+    # parallel nodes inside each graph run
+    semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def run_item(index: int) -> None:
+        message, given_thread_id = items[index]
+        async with semaphore:
+            try:
+                # Each item keeps the graph it was prepared with, even if a reload swaps it
+                graph, input_data, config = await _prepare_invocation(
+                    graph_name, message, thread_ids[index], is_new_thread=given_thread_id is None
+                )
+                output = await graph.ainvoke(input_data, config)
+            except Exception as e:
+                results[index] = BatchResult(thread_ids[index], error=e)
+                return
+        results[index] = BatchResult(thread_ids[index], response=_final_response(output))
+    
+    for wave in waves:
+        await asyncio.gather(*(run_item(index) for index in wave))
+    
+    return results
+
+
+async def invoke_graph_stream(
+    graph_name: str,
+    message: str,
+    thread_id: Optional[str] = None,
+    is_new_thread: bool = False,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Invoke a graph and yield progress events as they happen.
+    
+    Yields dicts with a "type" key:
+    - node_start / node_end: {"node": name}
+    - token: {"node": name, "content": text delta from the LLM}
+    - tool_start: {"node", "tool", "input"} / tool_end: {"node", "tool", "output"}
+    - final: {"content": response text}, always the last event
+    """
+    graph, input_data, config = await _prepare_invocation(graph_name, message, thread_id, is_new_thread)
+    
+    async for event in graph.astream_events(input_data, config, version="v2"):
+        kind = event["event"]
+        node = event.get("metadata", {}).get("langgraph_node")
+        
+        if kind == "on_chain_start" and node and event["name"] == node:
+            yield {"type": "node_start", "node": node}
+        elif kind == "on_chain_end" and node and event["name"] == node:
+            yield {"type": "node_end", "node": node}
+        elif kind == "on_chat_model_stream":
+            if NOSTREAM_TAG in event.get("tags", []):
+                continue
+            content = event["data"]["chunk"].content
+            if isinstance(content, list):
+                content = "".join(
+                    part.get("text", "") if isinstance(part, dict) else str(part) for part in content
+                )
+            if content:
+                yield {"type": "token", "node": node, "content": content}
+        elif kind == "on_tool_start":
+            yield {"type": "tool_start", "node": node, "tool": event["name"], "input": event["data"].get("input")}
+        elif kind == "on_tool_end":
+            output = event["data"].get("output")
+            yield {"type": "tool_end", "node": node, "tool": event["name"], "output": getattr(output, "content", output)}
+    
+    # Read the final answer back from the checkpointed state
+    state = await graph.aget_state(config)
+    yield {"type": "final", "content": _final_response(state.values)}
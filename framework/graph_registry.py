@@ -1,135 +1,286 @@
-"""Simplified graph registry using only @registered_graph decorators."""
+"""Graph registry backed by a static index of @registered_graph decorators.
+
+Graph files under graphs/ are scanned as text for ``@registered_graph("name")``
+instead of being imported, so listing graphs does not pull in langchain,
+langgraph or the Langfuse client. The scan results are cached by file mtime
+and size in GRAPH_INDEX_PATH. A graph's module is only imported when its build
+function or module is first requested. Files that register graphs under
+non-literal names are imported during discovery, as before. reload_files
+re-indexes edited files and reimports only the modules that were loaded.
+"""
 
-import importlib
 import importlib.util
-import sys
+import json
+import os
+import re
+import threading
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterable, List, Optional, Set
 from dataclasses import dataclass
-from framework.decorators.registered_graph import get_registered_graphs
+from framework.decorators.registered_graph import (
+    get_registered_graph,
+    get_registered_graphs,
+    registered_graph,
+    unregister_graph,
+)
 
 from framework.log_service import log
 
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_INDEX_PATH = PROJECT_ROOT / ".graph_index.json"
+
+# Bump when the index format or scanning rules change
+INDEX_VERSION = 1
+
+_REGISTERED_GRAPH = re.compile(r"""@registered_graph\(\s*(?:name\s*=\s*)?(["'])([^"'\\]+)\1\s*\)""")
+
 
 @dataclass
 class GraphInfo:
-    """Information about a discovered graph."""
+    """Information about a discovered graph; build_function and module load on demand."""
     name: str
-    build_function: callable
+    build_function: Optional[callable]
     module_path: str
     module: Any = None
+    file_path: str = ""
+
+
+def scan_graph_file(source: str) -> Optional[List[str]]:
+    """Graph names registered in a file's source, or None if they are not literals."""
+    names = [match.group(2) for match in _REGISTERED_GRAPH.finditer(source)]
+    if len(names) < source.count("@registered_graph("):
+        return None
+    return names
 
 
 class GraphRegistry:
-    """Clean registry that imports modules to trigger @registered_graph decorators."""
-    
-    def __init__(self):
+    """Registry that indexes graph files statically and imports them lazily."""
+
+    def __init__(self, graphs_dir: Optional[Path] = None, index_path: Optional[str] = None):
+        self._graphs_dir = graphs_dir or PROJECT_ROOT / "graphs"
+        self._index_path = index_path or os.getenv("GRAPH_INDEX_PATH", str(DEFAULT_INDEX_PATH))
         self._graphs: Dict[str, GraphInfo] = {}
         self._discovered: bool = False
+        # Index entries by file path relative to graphs/
+        self._index: Dict[str, Dict[str, Any]] = {}
         self._modules: Dict[str, Any] = {}  # Store imported modules
-    
-    def _discover_graphs(self) -> None:
-        """Import modules to trigger @registered_graph decorators."""
-        project_root = Path(__file__).parent.parent
-        graphs_dir = project_root / "graphs"
-        
-        if not graphs_dir.exists():
-            log(f"Warning: Graphs directory not found at {graphs_dir}")
-            return
-        
-        # Import Python files in root graphs directory
-        for py_file in graphs_dir.glob("*.py"):
-            if py_file.name.startswith('__'):
-                continue    
-                
-            module_name = py_file.stem
-            try:
-                spec = importlib.util.spec_from_file_location(
-                    f"graphs.{module_name}", 
-                    py_file
-                )
-                if spec and spec.loader:
-                    module = importlib.util.module_from_spec(spec)
-                    spec.loader.exec_module(module)
-                    # Store the module for later access
-                    self._store_module(f"graphs.{module_name}", module)
-            except Exception as e:
-                log(f"Warning: Could not import {module_name}: {e}")
-        
-        # Import Python files in subdirectories
-        for subdir in graphs_dir.iterdir():
+        # Serializes discovery and imports; module execution is not thread-safe
+        self._lock = threading.RLock()
+
+    def _graph_files(self) -> List[Path]:
+        """Python files directly in graphs/ and in its subdirectories."""
+        files = [f for f in self._graphs_dir.glob("*.py") if not f.name.startswith('__')]
+        for subdir in sorted(self._graphs_dir.iterdir()):
             if subdir.is_dir():
-                for py_file in subdir.glob("*.py"):
-                    if py_file.name.startswith('__'):
-                        continue
-                    
-                    module_name = py_file.stem
-                    try:
-                        spec = importlib.util.spec_from_file_location(
-                            f"graphs.{subdir.name}.{module_name}", 
-                            py_file
-                        )
-                        if spec and spec.loader:
-                            module = importlib.util.module_from_spec(spec)
-                            spec.loader.exec_module(module)
-                            # Store the module for later access
-                            self._store_module(f"graphs.{subdir.name}.{module_name}", module)
-                    except Exception as e:
-                        log(f"Warning: Could not import {subdir.name}.{module_name}: {e}")
-        
-        # Now get all the registered graphs from the decorator system
-        registered_graphs = get_registered_graphs()
-        
-        for name, build_func in registered_graphs.items():
-            module_path = getattr(build_func, '__module__', 'unknown')
-            # Find the corresponding module we imported
-            module = self._modules.get(module_path)
+                files.extend(f for f in subdir.glob("*.py") if not f.name.startswith('__'))
+        return sorted(files)
+
+    def _module_name(self, py_file: Path) -> str:
+        relative = py_file.relative_to(self._graphs_dir).with_suffix("")
+        return ".".join(("graphs",) + relative.parts)
+
+    @property
+    def graphs_dir(self) -> Path:
+        return self._graphs_dir
+
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self._index_path) as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(index, dict) or index.get("version") != INDEX_VERSION:
+            return {}
+        return index.get("files", {})
+
+    def _save_index(self, files: Dict[str, Dict[str, Any]]) -> None:
+        tmp_path = f"{self._index_path}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump({"version": INDEX_VERSION, "files": files}, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self._index_path)
+        except OSError as e:
+            log(f"Warning: Could not write graph index {self._index_path}: {e}")
+
+    def _is_graph_file(self, py_file: Path) -> bool:
+        return (
+            py_file.suffix == ".py"
+            and not py_file.name.startswith('__')
+            and self._graphs_dir in (py_file.parent, py_file.parent.parent)
+        )
+
+    def _scan_file(self, py_file: Path, cached: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Index entry for a file, reusing ``cached`` if the file is unchanged."""
+        stat = py_file.stat()
+        if cached and cached.get("mtime_ns") == stat.st_mtime_ns and cached.get("size") == stat.st_size:
+            return cached
+        try:
+            names = scan_graph_file(py_file.read_text(encoding="utf-8"))
+        except (OSError, UnicodeDecodeError) as e:
+            log(f"Warning: Could not read {py_file}: {e}")
+            return None
+        return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "names": names}
+
+    def _add_file(self, py_file: Path, entry: Dict[str, Any]) -> None:
+        module_path = self._module_name(py_file)
+        if entry["names"] is None:
+            # Names are computed at import time; only importing reveals them
+            self._import_module(module_path, py_file)
+            return
+        for name in entry["names"]:
             self._graphs[name] = GraphInfo(
-                name=name,
-                build_function=build_func,
-                module_path=module_path,
-                module=module
+                name=name, build_function=None, module_path=module_path, file_path=str(py_file)
             )
-    
+
+    def _discover_graphs(self) -> None:
+        """Build the graph list from the static index, rescanning files that changed."""
+        if not self._graphs_dir.exists():
+            log(f"Warning: Graphs directory not found at {self._graphs_dir}")
+            return
+
+        cached = self._load_index()
+        for py_file in self._graph_files():
+            key = str(py_file.relative_to(self._graphs_dir))
+            entry = self._scan_file(py_file, cached.get(key))
+            if entry is None:
+                continue
+            self._index[key] = entry
+            self._add_file(py_file, entry)
+
+        if self._index != cached:
+            self._save_index(self._index)
+
+    def reload_files(self, paths: Iterable[str]) -> Set[str]:
+        """Re-index changed graph files, reimporting the ones already imported.
+
+        Returns the names of the graphs that were added, removed or reloaded. A
+        file that no longer imports keeps serving its previous graphs.
+        """
+        self._ensure_discovered()
+        changed: Set[str] = set()
+        with self._lock:
+            for path in paths:
+                py_file = Path(os.path.abspath(path))
+                if not self._is_graph_file(py_file):
+                    continue
+                key = str(py_file.relative_to(self._graphs_dir))
+                module_path = self._module_name(py_file)
+                entry = self._scan_file(py_file, None) if py_file.exists() else None
+                if py_file.exists() and entry is None:
+                    continue
+
+                previous = {n: info for n, info in self._graphs.items() if info.module_path == module_path}
+                previous_module = self._modules.pop(module_path, None)
+                for name in previous:
+                    del self._graphs[name]
+                    unregister_graph(name)
+
+                if entry is not None and (previous_module is not None or entry["names"] is None):
+                    if self._import_module(module_path, py_file) is None:
+                        log(f"[Graphs] Keeping the previous version of {module_path}")
+                        for name, build_func in get_registered_graphs().items():
+                            if getattr(build_func, '__module__', None) == module_path:
+                                unregister_graph(name)
+                        self._graphs.update(previous)
+                        if previous_module is not None:
+                            self._store_module(module_path, previous_module)
+                        for name, info in previous.items():
+                            if info.build_function is not None:
+                                registered_graph(name)(info.build_function)
+                        continue
+                elif entry is not None:
+                    self._add_file(py_file, entry)
+
+                if entry is None:
+                    self._index.pop(key, None)
+                else:
+                    self._index[key] = entry
+                current = {n for n, info in self._graphs.items() if info.module_path == module_path}
+                changed |= previous.keys() | current
+                log(f"[Graphs] Reloaded {module_path}: {', '.join(sorted(current)) or 'no graphs'}")
+            self._save_index(self._index)
+        return changed
+
+    def _import_module(self, module_path: str, py_file: Path) -> Optional[Any]:
+        """Import a graph file, registering the graphs it defines."""
+        if module_path in self._modules:
+            return self._modules[module_path]
+        try:
+            spec = importlib.util.spec_from_file_location(module_path, py_file)
+            if not spec or not spec.loader:
+                return None
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+        except Exception as e:
+            log(f"Warning: Could not import {module_path}: {e}")
+            return None
+        # Store the module for later access
+        self._store_module(module_path, module)
+
+        for name, build_func in get_registered_graphs().items():
+            if getattr(build_func, '__module__', None) != module_path:
+                continue
+            info = self._graphs.get(name)
+            if info is None:
+                info = self._graphs[name] = GraphInfo(
+                    name=name, build_function=None, module_path=module_path, file_path=str(py_file)
+                )
+            info.build_function = build_func
+            info.module = module
+        return module
+
+    def _load(self, info: GraphInfo) -> GraphInfo:
+        """Import the graph's module if that has not happened yet."""
+        if info.build_function is not None:
+            return info
+        with self._lock:
+            if info.build_function is None:
+                self._import_module(info.module_path, Path(info.file_path))
+                if info.build_function is None and get_registered_graph(info.name) is None:
+                    log(f"Warning: {info.module_path} did not register graph '{info.name}'")
+        return info
+
     def _store_module(self, module_path: str, module: Any) -> None:
         """Store an imported module for later access."""
         self._modules[module_path] = module
-    
+
     def _ensure_discovered(self) -> None:
         """Ensure graphs have been discovered."""
-        if not self._discovered:
-            self._discover_graphs()
-            self._discovered = True
-    
+        if self._discovered:
+            return
+        with self._lock:
+            if not self._discovered:
+                self._discover_graphs()
+                self._discovered = True
+
     def list_graphs(self) -> List[GraphInfo]:
-        """Get a list of all discovered graphs."""
+        """Get a list of all discovered graphs without importing them."""
         self._ensure_discovered()
         return list(self._graphs.values())
-    
+
     def get_graph_info(self, name: str) -> Optional[GraphInfo]:
         """Get graph info by name."""
         self._ensure_discovered()
         return self._graphs.get(name)
-    
+
     def get_build_function(self, name: str) -> Optional[callable]:
-        """Get the build function for a graph by name."""
+        """Get the build function for a graph by name, importing its module."""
         self._ensure_discovered()
         graph_info = self._graphs.get(name)
-        return graph_info.build_function if graph_info else None
-    
+        return self._load(graph_info).build_function if graph_info else None
+
     def get_graph_module(self, name: str) -> Optional[Any]:
         """Get the graph module by name to access init_state and other functions."""
         self._ensure_discovered()
         graph_info = self._graphs.get(name)
         if not graph_info:
             return None
-        
-        # Return the stored module directly
-        return graph_info.module
+
+        return self._load(graph_info).module
 
 
 # Global singleton registry instance
 registry = GraphRegistry()
 
 # Export the singleton registry
-__all__ = ["registry"]
\ No newline at end of file
+__all__ = ["registry"]
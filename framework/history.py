@@ -0,0 +1,214 @@
+"""Token-budgeted conversation history for LLM calls.
+
+Checkpointed threads keep every message forever, so nodes pass their messages
+through atrim_history() before calling the LLM. Trimming is off unless
+HISTORY_MAX_TOKENS is set to a token budget; then the system prompt and the
+current turn are always kept, and older turns are kept newest-first while they
+fit. With HISTORY_STRATEGY=summarize the dropped turns are rolled into a
+running summary instead of being discarded.
+"""
+
+import asyncio
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+from langchain_core.messages.utils import count_tokens_approximately, get_buffer_string
+from langchain_core.runnables import RunnableConfig
+
+from framework.async_runner import run_async
+from framework.llm import DEFAULT_DEPLOYMENT, get_chat_model
+from framework.log_service import log
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+SUMMARY_INSTRUCTIONS = (
+    "Summarize the conversation below for an assistant that will continue it. "
+    "Keep facts, decisions, names, links and open questions. Be concise."
+)
+
+# Tag checked by invoke_graph_stream so summary tokens are not streamed to the user
+NOSTREAM_TAG = "nostream"
+
+TokenCounter = Callable[[Sequence[BaseMessage]], int]
+# (graph or checkpoint namespace, thread_id)
+SummaryKey = Tuple[str, str]
+
+
+def get_max_tokens() -> Optional[int]:
+    """Token budget for history sent to the LLM; None (the default) disables trimming."""
+    value = os.getenv("HISTORY_MAX_TOKENS", "").strip()
+    if not value or value == "0":
+        return None
+    return int(value)
+
+
+def get_strategy() -> str:
+    """How to handle turns that do not fit: "drop" or "summarize"."""
+    return os.getenv("HISTORY_STRATEGY", "drop").strip().lower()
+
+
+def _split_turns(messages: Sequence[BaseMessage]) -> List[List[BaseMessage]]:
+    """Group messages into turns that each start at a HumanMessage.
+
+    Keeping whole turns guarantees tool calls are never separated from their
+    ToolMessage results.
+    """
+    turns: List[List[BaseMessage]] = []
+    for message in messages:
+        if isinstance(message, HumanMessage) or not turns:
+            turns.append([])
+        turns[-1].append(message)
+    return turns
+
+
+def select_history(
+    messages: Sequence[BaseMessage],
+    max_tokens: int,
+    token_counter: TokenCounter = count_tokens_approximately,
+) -> Tuple[List[BaseMessage], List[BaseMessage], List[BaseMessage]]:
+    """Split messages into (leading system messages, dropped, kept) within the budget."""
+    head = 0
+    while head < len(messages) and isinstance(messages[head], SystemMessage):
+        head += 1
+    system, rest = list(messages[:head]), list(messages[head:])
+
+    turns = _split_turns(rest)
+    if not turns:
+        return system, [], []
+
+    # The current turn is always sent, even if it alone exceeds the budget
+    kept_turns = [turns[-1]]
+    used = token_counter(system) + token_counter(turns[-1])
+    for turn in reversed(turns[:-1]):
+        cost = token_counter(turn)
+        if used + cost > max_tokens:
+            break
+        kept_turns.insert(0, turn)
+        used += cost
+
+    dropped = [m for turn in turns[: len(turns) - len(kept_turns)] for m in turn]
+    kept = [m for turn in kept_turns for m in turn]
+    return system, dropped, kept
+
+
+class _SummaryCache:
+    """Running summaries per (graph, thread), so each dropped turn is summarized only once."""
+
+    def __init__(self, max_threads: int = 1000):
+        self._max_threads = max_threads
+        self._summaries: "OrderedDict[SummaryKey, Tuple[int, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: SummaryKey) -> Tuple[int, str]:
+        with self._lock:
+            if key not in self._summaries:
+                return 0, ""
+            self._summaries.move_to_end(key)
+            return self._summaries[key]
+
+    def set(self, key: SummaryKey, covered: int, summary: str) -> None:
+        with self._lock:
+            self._summaries[key] = (covered, summary)
+            self._summaries.move_to_end(key)
+            while len(self._summaries) > self._max_threads:
+                self._summaries.popitem(last=False)
+
+
+_summary_cache = _SummaryCache()
+
+
+def _summary_model():
+    return get_chat_model(os.getenv("HISTORY_SUMMARY_DEPLOYMENT", DEFAULT_DEPLOYMENT))
+
+
+def _summary_request(previous: str, dropped: Sequence[BaseMessage]) -> List[BaseMessage]:
+    transcript = get_buffer_string(dropped)
+    if previous:
+        transcript = f"{SUMMARY_PREFIX}{previous}\n\n{transcript}"
+    return [SystemMessage(content=SUMMARY_INSTRUCTIONS), HumanMessage(content=transcript)]
+
+
+def _summary_config(config: Optional[RunnableConfig]) -> RunnableConfig:
+    tags = list((config or {}).get("tags") or []) + [NOSTREAM_TAG]
+    return {**(config or {}), "tags": tags, "run_name": "history_summary"}
+
+
+def _summary_key(config: Optional[RunnableConfig]) -> Optional[SummaryKey]:
+    """Key of the thread's running summary; thread ids are only unique per graph."""
+    config = config or {}
+    thread_id = (config.get("configurable") or {}).get("thread_id")
+    if not thread_id:
+        return None
+    metadata = config.get("metadata") or {}
+    graph = metadata.get("graph")
+    if not graph:
+        # Namespace segments are "node:task_id"; drop the per-step task ids
+        namespace = metadata.get("langgraph_checkpoint_ns", "")
+        graph = "|".join(part.split(":")[0] for part in namespace.split("|"))
+    return graph, thread_id
+
+
+async def _summarize(dropped: List[BaseMessage], config: Optional[RunnableConfig]) -> Optional[str]:
+    """Return a summary of the dropped messages, extending the thread's cached summary."""
+    key = _summary_key(config)
+    covered, previous = _summary_cache.get(key) if key else (0, "")
+    if covered > len(dropped):
+        # History was rewritten (e.g. an evicted thread was restarted); start over
+        covered, previous = 0, ""
+    if covered == len(dropped):
+        return previous or None
+    try:
+        ai = await _summary_model().ainvoke(_summary_request(previous, dropped[covered:]), config=_summary_config(config))
+    except Exception as e:
+        log(f"History summary failed, dropping old turns instead: {e}")
+        return previous or None
+    summary = str(ai.content)
+    if key:
+        _summary_cache.set(key, len(dropped), summary)
+    return summary
+
+
+def _budget(max_tokens: Optional[int]) -> Optional[int]:
+    return max_tokens if max_tokens is not None else get_max_tokens()
+
+
+async def atrim_history(
+    messages: Sequence[BaseMessage],
+    config: Optional[RunnableConfig] = None,
+    max_tokens: Optional[int] = None,
+    strategy: Optional[str] = None,
+) -> List[BaseMessage]:
+    """Return the messages to send to the LLM for this turn.
+
+    Defaults come from HISTORY_MAX_TOKENS and HISTORY_STRATEGY. Pass the node's
+    config so summaries are cached per thread and traced with the node.
+    """
+    max_tokens = _budget(max_tokens)
+    if max_tokens is None:
+        return list(messages)
+
+    system, dropped, kept = select_history(messages, max_tokens)
+    if not dropped:
+        return list(messages)
+
+    if (strategy or get_strategy()) == "summarize":
+        summary = await _summarize(dropped, config)
+        if summary:
+            system = system + [SystemMessage(content=SUMMARY_PREFIX + summary)]
+    return system + kept
+
+
+def trim_history(
+    messages: Sequence[BaseMessage],
+    config: Optional[RunnableConfig] = None,
+    max_tokens: Optional[int] = None,
+    strategy: Optional[str] = None,
+) -> List[BaseMessage]:
+    """Synchronous atrim_history for sync nodes; runs it on the shared event loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return run_async(atrim_history(messages, config, max_tokens, strategy))
+    raise RuntimeError("trim_history() blocks the event loop; use await atrim_history() in async code")
@@ -0,0 +1,352 @@
+"""Shared Azure OpenAI chat model factory.
+
+Graph nodes call get_chat_model() instead of constructing AzureChatOpenAI on
+every invocation. Models are cached per (deployment, api_version, tool set) and
+all share one pair of keep-alive HTTP connection pools, so TLS handshakes and
+tool-schema conversion are paid once per process instead of once per call.
+Nodes with deterministic prompts pass cache=True to opt into the response
+cache in framework.llm_cache. With COALESCE_REQUESTS on, identical concurrent
+requests are coalesced into a single API call (see framework.singleflight); for
+streamed requests every caller receives the shared stream's chunks as they arrive.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import httpx
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.language_models.chat_models import generate_from_stream
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+from langchain_core.runnables import Runnable
+from langchain_core.runnables.config import var_child_runnable_config
+from langchain_openai import AzureChatOpenAI
+
+from framework.cassette import decode, encode, get_cassette
+from framework.llm_cache import SQLiteLLMCache, cache_for, request_key
+from framework.rate_limit import (
+    acall_with_retries,
+    astream_with_retries,
+    call_with_retries,
+    estimate_tokens,
+    rate_limiter,
+    stream_with_retries,
+)
+from framework.singleflight import SingleFlight
+
+DEFAULT_DEPLOYMENT = "gpt-4o-mini"
+DEFAULT_API_VERSION = "2024-12-01-preview"
+
+# Bound-tool variants kept; graphs rebuilt after a reload get fresh tool objects
+MAX_BOUND_MODELS = 64
+
+_models: Dict[Tuple[str, str, bool], BaseChatModel] = {}
+# key -> (the tools, bound model); holding the tools keeps their ids from being reused
+_bound_models: "OrderedDict[Tuple[Any, ...], Tuple[Tuple[Any, ...], Runnable]]" = OrderedDict()
+_http_clients: Optional[Tuple[httpx.Client, httpx.AsyncClient]] = None
+_lock = threading.Lock()
+
+_llm_flights = SingleFlight("llm")
+
+
+class FrameworkChatModelMixin:
+    """Request handling shared by every chat model created by get_chat_model().
+
+    Mixed in ahead of the concrete model class so it wraps the model's own
+    _generate/_agenerate and _stream/_astream (used under astream_events, i.e.
+    the streaming web chat); response-cache hits are served before reaching it.
+    Identical concurrent requests (async streams included) are coalesced first
+    when COALESCE_REQUESTS is on, then each remaining one waits for rate-limit
+    capacity and is retried on transient errors. Requests
+    are recorded to or replayed from the cassette when CASSETTE_MODE is set.
+    """
+
+    def _request_key(self, messages: List[BaseMessage], stop: Optional[List[str]], kwargs: Dict[str, Any]) -> str:
+        # Only the fields sent to the API; ids and response metadata differ per run
+        prompt = repr([
+            (m.type, m.content, m.name, getattr(m, "tool_calls", None), getattr(m, "tool_call_id", None))
+            for m in messages
+        ])
+        return request_key(prompt, self._get_llm_string(stop=stop, **kwargs))
+
+    def _fallback_key(self, messages: List[BaseMessage], stop: Optional[List[str]], kwargs: Dict[str, Any], run_manager: Any) -> str:
+        # Looser cassette key for prompts with run-specific text such as timestamps
+        # Streams may be opened without a run manager; the node's config is still in context
+        metadata = getattr(run_manager, "metadata", None) or (var_child_runnable_config.get() or {}).get("metadata") or {}
+        node = metadata.get("langgraph_node", "")
+        return request_key(repr((node, [m.type for m in messages])), self._get_llm_string(stop=stop, **kwargs))
+
+    def _deployment(self) -> str:
+        return getattr(self, "deployment_name", None) or "default"
+
+    def _estimate_tokens(self, messages: List[BaseMessage], kwargs: Dict[str, Any]) -> int:
+        return estimate_tokens(messages, kwargs.get("max_tokens") or getattr(self, "max_tokens", None))
+
+    def _wraps_streaming(self) -> bool:
+        # _stream/_astream are always defined here; stream only if the wrapped model can
+        for cls in type(self).__mro__[type(self).__mro__.index(FrameworkChatModelMixin) + 1:]:
+            if cls is BaseChatModel:
+                return False
+            if "_stream" in cls.__dict__ or "_astream" in cls.__dict__:
+                return True
+        return False
+
+    def _should_stream(self, **kwargs: Any) -> bool:
+        return self._wraps_streaming() and super()._should_stream(**kwargs)
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        parent = super(FrameworkChatModelMixin, self)
+        deployment, tokens = self._deployment(), self._estimate_tokens(messages, kwargs)
+
+        def call() -> ChatResult:
+            result = call_with_retries(
+                rate_limiter, deployment, tokens,
+                lambda: parent._generate(messages, stop=stop, run_manager=run_manager, **kwargs),
+            )
+            rate_limiter.settle(deployment, tokens, _total_tokens(result.generations))
+            return result
+
+        key = self._request_key(messages, stop, kwargs)
+        cassette = get_cassette()
+        if cassette is not None and cassette.replaying:
+            fallback_key = self._fallback_key(messages, stop, kwargs, run_manager)
+            return _decode_result(cassette.replay("llm", key, f"a {deployment} completion", fallback_key))
+        start = time.perf_counter()
+        result = _llm_flights.do(key, call)
+        if cassette is not None:
+            cassette.record(
+                "llm", key, _encode_result(result), time.perf_counter() - start,
+                fallback_key=self._fallback_key(messages, stop, kwargs, run_manager),
+            )
+        return result
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        parent = super(FrameworkChatModelMixin, self)
+        deployment, tokens = self._deployment(), self._estimate_tokens(messages, kwargs)
+
+        async def call() -> ChatResult:
+            result = await acall_with_retries(
+                rate_limiter, deployment, tokens,
+                lambda: parent._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs),
+            )
+            rate_limiter.settle(deployment, tokens, _total_tokens(result.generations))
+            return result
+
+        key = self._request_key(messages, stop, kwargs)
+        cassette = get_cassette()
+        if cassette is not None and cassette.replaying:
+            fallback_key = self._fallback_key(messages, stop, kwargs, run_manager)
+            return _decode_result(await cassette.areplay("llm", key, f"a {deployment} completion", fallback_key))
+        start = time.perf_counter()
+        result = await _llm_flights.ado(key, call)
+        if cassette is not None:
+            cassette.record(
+                "llm", key, _encode_result(result), time.perf_counter() - start,
+                fallback_key=self._fallback_key(messages, stop, kwargs, run_manager),
+            )
+        return result
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        parent = super(FrameworkChatModelMixin, self)
+        deployment, tokens = self._deployment(), self._estimate_tokens(messages, kwargs)
+
+        key = self._request_key(messages, stop, kwargs)
+        cassette = get_cassette()
+        if cassette is not None and cassette.replaying:
+            fallback_key = self._fallback_key(messages, stop, kwargs, run_manager)
+            yield from _result_chunks(_decode_result(cassette.replay("llm", key, f"a {deployment} completion", fallback_key)))
+            return
+        start = time.perf_counter()
+        chunks: List[ChatGenerationChunk] = []
+        for chunk in stream_with_retries(
+            rate_limiter, deployment, tokens,
+            lambda: parent._stream(messages, stop=stop, run_manager=run_manager, **kwargs),
+        ):
+            chunks.append(chunk)
+            yield chunk
+        rate_limiter.settle(deployment, tokens, _total_tokens(chunks))
+        if cassette is not None and chunks:
+            cassette.record(
+                "llm", key, _encode_result(generate_from_stream(iter(chunks))), time.perf_counter() - start,
+                fallback_key=self._fallback_key(messages, stop, kwargs, run_manager),
+            )
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        parent = super(FrameworkChatModelMixin, self)
+        deployment, tokens = self._deployment(), self._estimate_tokens(messages, kwargs)
+
+        async def call() -> AsyncIterator[ChatGenerationChunk]:
+            chunks: List[ChatGenerationChunk] = []
+            async for chunk in astream_with_retries(
+                rate_limiter, deployment, tokens,
+                lambda: parent._astream(messages, stop=stop, run_manager=run_manager, **kwargs),
+            ):
+                chunks.append(chunk)
+                yield chunk
+            rate_limiter.settle(deployment, tokens, _total_tokens(chunks))
+
+        key = self._request_key(messages, stop, kwargs)
+        cassette = get_cassette()
+        if cassette is not None and cassette.replaying:
+            fallback_key = self._fallback_key(messages, stop, kwargs, run_manager)
+            entry = await cassette.areplay("llm", key, f"a {deployment} completion", fallback_key)
+            for chunk in _result_chunks(_decode_result(entry)):
+                yield chunk
+            return
+        start = time.perf_counter()
+        chunks: List[ChatGenerationChunk] = []
+        async for chunk in _llm_flights.astream(key, call):
+            chunks.append(chunk)
+            yield chunk
+        if cassette is not None and chunks:
+            cassette.record(
+                "llm", key, _encode_result(generate_from_stream(iter(chunks))), time.perf_counter() - start,
+                fallback_key=self._fallback_key(messages, stop, kwargs, run_manager),
+            )
+
+
+def _encode_result(result: ChatResult) -> Dict[str, Any]:
+    return {"generations": encode(result.generations), "llm_output": result.llm_output}
+
+
+def _decode_result(entry: Dict[str, Any]) -> ChatResult:
+    return ChatResult(generations=decode(entry["generations"]), llm_output=entry.get("llm_output"))
+
+
+def _result_chunks(result: ChatResult) -> Iterator[ChatGenerationChunk]:
+    """A recorded completion as stream chunks, so it replays into streamed calls too."""
+    for generation in result.generations:
+        message = generation.message
+        if isinstance(message, AIMessage):
+            message = AIMessageChunk(
+                content=message.content,
+                additional_kwargs=message.additional_kwargs,
+                response_metadata=message.response_metadata,
+                usage_metadata=message.usage_metadata,
+                id=message.id,
+                tool_call_chunks=[
+                    {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": index,
+                     "type": "tool_call_chunk"}
+                    for index, call in enumerate(message.tool_calls)
+                ],
+            )
+        yield ChatGenerationChunk(message=message, generation_info=generation.generation_info)
+
+
+def _total_tokens(generations: Sequence[Any]) -> Optional[int]:
+    # For streams, usage arrives on the final chunk, and only if the API was asked to include it
+    usage = [getattr(g.message, "usage_metadata", None) for g in generations]
+    totals = [u["total_tokens"] for u in usage if u and "total_tokens" in u]
+    return sum(totals) if totals else None
+
+
+class FrameworkAzureChatOpenAI(FrameworkChatModelMixin, AzureChatOpenAI):
+    """AzureChatOpenAI with the framework's request handling."""
+
+
+def _get_http_clients() -> Tuple[httpx.Client, httpx.AsyncClient]:
+    """Process-wide sync/async HTTP clients with pooled keep-alive connections."""
+    global _http_clients
+    if _http_clients is None:
+        max_connections = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+        timeout = float(os.getenv("LLM_TIMEOUT_SECONDS", "120"))
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        _http_clients = (
+            httpx.Client(limits=limits, timeout=timeout),
+            httpx.AsyncClient(limits=limits, timeout=timeout),
+        )
+    return _http_clients
+
+
+def _create_chat_model(deployment: str, api_version: str, cache: Optional[SQLiteLLMCache]) -> BaseChatModel:
+    http_client, http_async_client = _get_http_clients()
+    # Replayed runs never reach Azure, so they work without credentials
+    cassette = get_cassette()
+    placeholder = "cassette-replay" if cassette is not None and cassette.replaying else None
+    return FrameworkAzureChatOpenAI(
+        cache=cache,
+        api_key=os.getenv("AZURE_OPENAI_API_KEY") or placeholder,
+        azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT") or (placeholder and "https://cassette-replay.invalid"),
+        api_version=api_version,
+        deployment_name=deployment,
+        http_client=http_client,
+        http_async_client=http_async_client,
+        # Retries are coordinated by framework.rate_limit instead of per client
+        max_retries=0,
+    )
+
+
+def _tools_key(tools: Sequence[Any]) -> Tuple[Any, ...]:
+    # Identity is a cheap and exact key as long as the cache entry holds the tools
+    # (see _bound_models); names are included to keep the key readable when debugging
+    return tuple((getattr(tool, "name", None), id(tool)) for tool in tools)
+
+
+def get_chat_model(
+    deployment: str = DEFAULT_DEPLOYMENT,
+    api_version: str = DEFAULT_API_VERSION,
+    tools: Optional[Sequence[Any]] = None,
+    cache: Optional[bool] = None,
+) -> Runnable:
+    """Return a cached chat model, with tools bound if given.
+
+    ``cache`` marks the call site as cacheable (True), never cacheable (False) or
+    following LLM_CACHE (None); see framework.llm_cache.
+    """
+    # With a cassette active every completion must reach the mixin to be recorded or replayed
+    response_cache = cache_for(cache) if get_cassette() is None else None
+    model_key = (deployment, api_version, response_cache is not None)
+    with _lock:
+        model = _models.get(model_key)
+        if model is None:
+            model = _create_chat_model(deployment, api_version, response_cache)
+            _models[model_key] = model
+        if not tools:
+            return model
+
+        key = (*model_key, _tools_key(tools))
+        entry = _bound_models.get(key)
+        if entry is None:
+            entry = (tuple(tools), model.bind_tools(list(tools)))
+            _bound_models[key] = entry
+            while len(_bound_models) > MAX_BOUND_MODELS:
+                _bound_models.popitem(last=False)
+        else:
+            _bound_models.move_to_end(key)
+        return entry[1]
+
+
+def reset_chat_models() -> None:
+    """Drop cached models, e.g. after credentials in the environment changed."""
+    with _lock:
+        _models.clear()
+        _bound_models.clear()
@@ -0,0 +1,234 @@
+"""Disk-backed LLM response cache.
+
+Responses are keyed by a hash of the model's llm_string (deployment, api
+version, bound tools and call parameters) plus the serialized prompt messages,
+and stored in SQLite with a TTL and size-based LRU eviction. Caching is opt-in:
+
+- LLM_CACHE=off (default): nothing is cached
+- LLM_CACHE=nodes: only models requested with get_chat_model(cache=True)
+- LLM_CACHE=all: every model created by framework.llm
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import warnings
+from typing import Any, Optional
+
+from langchain_core._api import LangChainBetaWarning
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+
+from framework.log_service import log
+
+LLM_CACHE_ENV = "LLM_CACHE"
+LLM_CACHE_PATH_ENV = "LLM_CACHE_PATH"
+LLM_CACHE_TTL_ENV = "LLM_CACHE_TTL_SECONDS"
+LLM_CACHE_MAX_BYTES_ENV = "LLM_CACHE_MAX_BYTES"
+
+DEFAULT_PATH = "llm_cache.db"
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache (accessed);
+CREATE INDEX IF NOT EXISTS llm_cache_created ON llm_cache (created);
+"""
+
+
+# Message fields that differ between otherwise identical prompts
+_VOLATILE_MESSAGE_FIELDS = ("id", "response_metadata", "usage_metadata")
+
+
+def _normalize_prompt(prompt: str) -> str:
+    """Drop per-run message ids and response metadata from a serialized prompt."""
+    try:
+        messages = json.loads(prompt)
+    except ValueError:
+        return prompt
+    if not isinstance(messages, list):
+        return prompt
+    for message in messages:
+        kwargs = message.get("kwargs") if isinstance(message, dict) else None
+        if isinstance(kwargs, dict):
+            for field in _VOLATILE_MESSAGE_FIELDS:
+                kwargs.pop(field, None)
+    return json.dumps(messages, sort_keys=True)
+
+
+def request_key(prompt: str, llm_string: str) -> str:
+    """Stable hash of a model configuration and prompt."""
+    return hashlib.sha256(f"{llm_string}\0{prompt}".encode("utf-8")).hexdigest()
+
+
+class SQLiteLLMCache(BaseCache):
+    """LangChain LLM cache stored in SQLite with TTL expiry and LRU eviction by size.
+
+    ``ttl_seconds`` of None keeps entries until evicted; ``max_bytes`` of None
+    disables size-based eviction. Several processes can share one file.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_PATH,
+        ttl_seconds: Optional[float] = DEFAULT_TTL_SECONDS,
+        max_bytes: Optional[int] = DEFAULT_MAX_BYTES,
+    ):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def _stored_bytes(self) -> int:
+        # Read from the file rather than tracked in memory: other processes write to it too
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+
+    def _expired(self, created: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - created > self.ttl_seconds
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key = request_key(_normalize_prompt(prompt), llm_string)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, size, created FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            value, size, created = row
+            if self._expired(created, now):
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE llm_cache SET accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", LangChainBetaWarning)
+                return loads(value, allowed_objects="core")
+        except Exception as e:
+            log(f"Discarding unreadable LLM cache entry: {e}")
+            return None
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        key = request_key(_normalize_prompt(prompt), llm_string)
+        value = dumps(list(return_val))
+        size = len(value)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+            self._evict_locked(now)
+            self._conn.commit()
+
+    def _evict_locked(self, now: float) -> None:
+        if self.ttl_seconds is not None:
+            # SELECT then DELETE rather than DELETE ... RETURNING, which needs SQLite 3.35+
+            expired = self._conn.execute(
+                "SELECT key, size FROM llm_cache WHERE created < ?", (now - self.ttl_seconds,)
+            ).fetchall()
+            for key, size in expired:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self.evictions += 1
+
+        if self.max_bytes is None:
+            return
+        # The insert holds the write lock, so this total is current for every process
+        total_bytes = self._stored_bytes()
+        if total_bytes <= self.max_bytes:
+            return
+        # Least recently used entries go first
+        for key, size in self._conn.execute("SELECT key, size FROM llm_cache ORDER BY accessed").fetchall():
+            if total_bytes <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            total_bytes -= size
+            self.evictions += 1
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        """Return hit/miss/eviction counters and the current size."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            return {
+                "entries": entries,
+                "bytes": self._stored_bytes(),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+def _optional_number(name: str, default: Optional[float]) -> Optional[float]:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    value = value.strip()
+    if not value or value == "0":
+        return None
+    return float(value)
+
+
+_cache: Optional[SQLiteLLMCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache_mode() -> str:
+    """Return "off", "nodes" or "all" from LLM_CACHE."""
+    return os.getenv(LLM_CACHE_ENV, "off").strip().lower()
+
+
+def get_llm_cache() -> SQLiteLLMCache:
+    """Return the process-wide cache configured from the environment."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            max_bytes = _optional_number(LLM_CACHE_MAX_BYTES_ENV, DEFAULT_MAX_BYTES)
+            _cache = SQLiteLLMCache(
+                path=os.getenv(LLM_CACHE_PATH_ENV, DEFAULT_PATH),
+                ttl_seconds=_optional_number(LLM_CACHE_TTL_ENV, DEFAULT_TTL_SECONDS),
+                max_bytes=int(max_bytes) if max_bytes is not None else None,
+            )
+        return _cache
+
+
+def cache_for(requested: Optional[bool]) -> Optional[SQLiteLLMCache]:
+    """Resolve a node's cache request against LLM_CACHE.
+
+    ``requested`` is True for nodes whose prompts are deterministic, False to
+    never cache, and None to follow the global setting.
+    """
+    mode = get_cache_mode()
+    if requested is False or mode == "off":
+        return None
+    if mode == "all" or (mode == "nodes" and requested):
+        return get_llm_cache()
+    return None
@@ -0,0 +1,110 @@
+"""TTL cache for results of read-only MCP tool calls.
+
+Only tools listed under a server's "readCache" entry in mcp_config.json are
+cached, each with its own TTL and entry limit:
+
+    "readCache": {
+        "list_commits": {"ttlSeconds": 60, "maxEntries": 64},
+        "search_repositories": {}
+    }
+
+Results are keyed by server, tool and canonicalized arguments. Tool errors are
+never cached. MCP_READ_CACHE=off disables the cache without editing the config.
+"""
+
+import copy
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from framework.metrics import counter
+
+DEFAULT_TTL_SECONDS = 300.0
+DEFAULT_MAX_ENTRIES = 128
+
+MCP_CACHE_HITS = counter("mcp_read_cache_hits_total", "MCP tool calls served from the read cache")
+MCP_CACHE_MISSES = counter("mcp_read_cache_misses_total", "Cacheable MCP tool calls that went to the server")
+
+MISS = object()
+
+
+def read_cache_enabled() -> bool:
+    return os.getenv("MCP_READ_CACHE", "on").strip().lower() not in ("0", "false", "no", "off")
+
+
+class _ToolCache:
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # key -> (expiry time, result), least recently used first
+        self.entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+
+class ToolResultCache:
+    """Per-tool TTL + LRU caches for the tools on the allowlist."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tools: Dict[Tuple[str, str], _ToolCache] = {}
+
+    def configure(self, server_name: str, read_cache: Dict[str, Dict[str, Any]]) -> None:
+        """Replace the allowlist for one server from its "readCache" config entry."""
+        with self._lock:
+            previous = {key: cache for key, cache in self._tools.items() if key[0] == server_name}
+            for key in previous:
+                del self._tools[key]
+            for tool_name, policy in (read_cache or {}).items():
+                ttl_seconds = float(policy.get("ttlSeconds", DEFAULT_TTL_SECONDS))
+                max_entries = int(policy.get("maxEntries", DEFAULT_MAX_ENTRIES))
+                cache = previous.get((server_name, tool_name))
+                # Keep cached results when the tool's policy did not change
+                if cache is None or (cache.ttl_seconds, cache.max_entries) != (ttl_seconds, max_entries):
+                    cache = _ToolCache(ttl_seconds, max_entries)
+                self._tools[(server_name, tool_name)] = cache
+
+    def servers(self) -> set:
+        """Servers that have at least one cacheable tool."""
+        with self._lock:
+            return {server for server, _ in self._tools}
+
+    def cacheable(self, server_name: str, tool_name: str) -> bool:
+        return read_cache_enabled() and (server_name, tool_name) in self._tools
+
+    def get(self, server_name: str, tool_name: str, key: Hashable) -> Any:
+        """Cached result (a copy the caller may mutate), or MISS."""
+        now = time.monotonic()
+        with self._lock:
+            cache = self._tools.get((server_name, tool_name))
+            entry = cache.entries.get(key) if cache else None
+            if entry is not None and entry[0] > now:
+                cache.entries.move_to_end(key)
+                result = entry[1]
+            else:
+                if entry is not None:
+                    del cache.entries[key]
+                result = MISS
+        if result is MISS:
+            MCP_CACHE_MISSES.inc(server=server_name, tool=tool_name)
+            return MISS
+        MCP_CACHE_HITS.inc(server=server_name, tool=tool_name)
+        return copy.deepcopy(result)
+
+    def put(self, server_name: str, tool_name: str, key: Hashable, result: Any) -> None:
+        result = copy.deepcopy(result)
+        with self._lock:
+            cache = self._tools.get((server_name, tool_name))
+            if cache is None:
+                return
+            cache.entries[key] = (time.monotonic() + cache.ttl_seconds, result)
+            cache.entries.move_to_end(key)
+            while len(cache.entries) > cache.max_entries:
+                cache.entries.popitem(last=False)
+
+    def clear(self, server_name: Optional[str] = None) -> None:
+        """Drop cached results, for one server or all of them."""
+        with self._lock:
+            for (server, _), cache in self._tools.items():
+                if server_name is None or server == server_name:
+                    cache.entries.clear()
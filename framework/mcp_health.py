@@ -0,0 +1,103 @@
+"""Per-server circuit breakers for MCP tool calls.
+
+After MCP_BREAKER_FAILURES consecutive transport failures (timeouts, dead
+containers, refused connections) a server's breaker opens and tool calls fail
+immediately with MCPServerUnavailable instead of each waiting out its own
+timeout. Once the retry delay has passed, a single trial call or health probe
+is let through: success closes the breaker, failure reopens it with the delay
+doubled up to MCP_BREAKER_MAX_RESET_SECONDS. Errors reported by a tool itself
+show the server is up and count as success.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from langchain_core.tools import ToolException
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class MCPServerUnavailable(ToolException):
+    """Raised instead of calling a server whose circuit breaker is open."""
+
+
+def describe_error(error: BaseException) -> str:
+    """One-line description, unwrapping the task-group errors the MCP transports raise."""
+    # ExceptionGroup is only a builtin from Python 3.11
+    while getattr(error, "exceptions", None):
+        error = error.exceptions[0]
+    return f"{type(error).__name__}: {error}"
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        failure_threshold: Optional[int] = None,
+        reset_seconds: Optional[float] = None,
+        max_reset_seconds: Optional[float] = None,
+    ):
+        self.failure_threshold = failure_threshold or int(os.getenv("MCP_BREAKER_FAILURES", "3"))
+        self.reset_seconds = reset_seconds or float(os.getenv("MCP_BREAKER_RESET_SECONDS", "5"))
+        self.max_reset_seconds = max_reset_seconds or float(os.getenv("MCP_BREAKER_MAX_RESET_SECONDS", "300"))
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self.last_success: Optional[float] = None
+        self.last_failure: Optional[float] = None
+        self._opens = 0
+        self._retry_at = 0.0
+        self._trial = False
+
+    def allow(self) -> bool:
+        """Whether a call may go to the server now; claims the trial call when half-open."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self._trial or time.monotonic() < self._retry_at:
+                return False
+            self.state = HALF_OPEN
+            self._trial = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self._opens = 0
+            self._trial = False
+            self.last_success = time.time()
+
+    def release_trial(self) -> None:
+        """Give back a trial call that ended without a verdict, e.g. because it was cancelled."""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._trial = False
+
+    def record_failure(self, error: BaseException, trip: bool = False) -> None:
+        """Count a transport failure; ``trip`` opens the breaker regardless of the threshold."""
+        with self._lock:
+            self.failures += 1
+            self.last_error = describe_error(error)
+            self.last_failure = time.time()
+            if trip or self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                delay = min(self.max_reset_seconds, self.reset_seconds * 2 ** self._opens)
+                self._opens += 1
+                self.state = OPEN
+                self._retry_at = time.monotonic() + delay
+            self._trial = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "last_error": self.last_error,
+                "last_success": self.last_success,
+                "last_failure": self.last_failure,
+                "retry_in_seconds": round(max(0.0, self._retry_at - time.monotonic()), 1) if self.state != CLOSED else 0.0,
+            }
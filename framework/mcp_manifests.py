@@ -0,0 +1,87 @@
+"""On-disk cache of MCP tool manifests.
+
+Each server's tool definitions (name, description, input schema) are stored
+with a hash of its resolved connection settings. While the hash matches,
+framework.mcp_registry builds the server's tools from the cache at startup and
+only connects when a tool is first called; a changed config entry (or
+environment value it expands) invalidates the entry.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+from mcp.types import Tool as MCPTool
+
+from framework.log_service import log
+
+MCP_MANIFEST_CACHE_ENV = "MCP_MANIFEST_CACHE"
+DEFAULT_PATH = "mcp_manifests.json"
+
+
+def connection_hash(connection: Dict[str, Any]) -> str:
+    """Stable hash of a server's resolved connection settings."""
+    return hashlib.sha256(json.dumps(connection, sort_keys=True, default=repr).encode("utf-8")).hexdigest()
+
+
+class ManifestCache:
+    """JSON file mapping server name to its config hash and tool definitions."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = self._read()
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.path) as f:
+                entries = json.load(f)
+            return entries if isinstance(entries, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except ValueError as e:
+            log(f"[MCP] Ignoring unreadable tool manifest cache {self.path}: {e}")
+            return {}
+
+    def get(self, server_name: str, config_hash: str) -> Optional[List[MCPTool]]:
+        """Cached tools for the server, or None if missing or stale."""
+        with self._lock:
+            entry = self._entries.get(server_name)
+        if not entry or entry.get("hash") != config_hash:
+            return None
+        try:
+            return [MCPTool.model_validate(tool) for tool in entry["tools"]]
+        except (KeyError, ValueError) as e:
+            log(f"[MCP] Ignoring cached tool manifest for '{server_name}': {e}")
+            return None
+
+    def put(self, server_name: str, config_hash: str, tools: List[MCPTool]) -> bool:
+        """Store the server's tools; returns True if the manifest changed."""
+        entry = {
+            "hash": config_hash,
+            "tools": [tool.model_dump(mode="json", exclude_none=True) for tool in tools],
+        }
+        with self._lock:
+            if self._entries.get(server_name) == entry:
+                return False
+            self._entries[server_name] = entry
+            self._write_locked()
+        return True
+
+    def _write_locked(self) -> None:
+        # Written to a temporary file first so a crash never leaves half a manifest
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(self._entries, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            log(f"[MCP] Could not write tool manifest cache {self.path}: {e}")
+
+
+def get_manifest_cache() -> Optional[ManifestCache]:
+    """Cache at MCP_MANIFEST_CACHE, or None when it is set to an empty value."""
+    path = os.getenv(MCP_MANIFEST_CACHE_ENV, DEFAULT_PATH).strip()
+    return ManifestCache(path) if path else None
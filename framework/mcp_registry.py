@@ -1,11 +1,46 @@
 # framework/mcp_registry.py
+import asyncio
 import json
 import os
-from typing import Dict, List, Optional
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Set, Tuple
 
+from langchain_core.tools import ToolException
 from langchain_mcp_adapters.client import MultiServerMCPClient
+from langchain_mcp_adapters.tools import convert_mcp_tool_to_langchain_tool
+from mcp.types import Tool as MCPTool
 
+from framework.async_runner import submit_async
+from framework.cassette import decode, encode, get_cassette
+from framework.file_watcher import get_file_watcher
 from framework.log_service import log
+from framework.mcp_cache import MISS, ToolResultCache
+from framework.mcp_health import CLOSED, CircuitBreaker, MCPServerUnavailable, describe_error
+from framework.mcp_manifests import ManifestCache, connection_hash, get_manifest_cache
+from framework.mcp_sessions import SessionPool, get_pool_size, list_session_tools
+from framework.metrics import register_gauge_collector
+from framework.singleflight import SingleFlight
+
+# Default time allowed for one server to start and list its tools
+DEFAULT_CONNECT_TIMEOUT_SECONDS = 60.0
+
+
+def _call_timeout() -> float:
+    return float(os.getenv("MCP_CALL_TIMEOUT_SECONDS", "120"))
+
+
+def _health_check_interval() -> float:
+    return float(os.getenv("MCP_HEALTH_CHECK_SECONDS", "30"))
+
+
+def _connect_timeout(server_cfg: dict) -> float:
+    """Per-server "connectTimeoutSeconds", else MCP_CONNECT_TIMEOUT_SECONDS."""
+    value = server_cfg.get("connectTimeoutSeconds", os.getenv("MCP_CONNECT_TIMEOUT_SECONDS", ""))
+    return float(value) if str(value).strip() else DEFAULT_CONNECT_TIMEOUT_SECONDS
+
 
 # replaces placeholders like ${VAR} or ${VAR:-default} in config file with real environment variable values.
 def _expand(value: str) -> str:
@@ -30,56 +65,480 @@ def _expand(value: str) -> str:
     return re.sub(r"\$\{([^}]+)\}", repl, value)
 
 
+# Servers whose tools were requested while building a graph (see track_mcp_servers)
+_requested_servers: ContextVar[Optional[Set[str]]] = ContextVar("mcp_requested_servers", default=None)
+
+
+def _request_key(server_name: str, tool_name: str, arguments: Dict[str, Any]) -> tuple:
+    # Newer adapters pass the LangGraph runtime alongside the tool arguments
+    args = {k: v for k, v in arguments.items() if k != "runtime"}
+    return server_name, tool_name, json.dumps(args, sort_keys=True, default=repr)
+
+
 class _MCPRegistry:
     _client: Optional[MultiServerMCPClient] = None
     _tools_by_server: Dict[str, List] = {}
+    _timeouts: Dict[str, float] = {}
+    _hashes: Dict[str, str] = {}
+    _manifests: Optional[ManifestCache] = None
+    _flights = SingleFlight("mcp")
+    _results = ToolResultCache()
+    # (server name, id(event loop)) -> open sessions used by that loop
+    _pools: Dict[Tuple[str, int], SessionPool] = {}
+    _pools_lock = threading.Lock()
+    _breakers: Dict[str, CircuitBreaker] = {}
+    _config_path = "mcp_config.json"
+    _listeners: List[Callable[[Set[str]], None]] = []
+    # Bumped on every initialize so the previous health check loop stops
+    _generation = 0
 
     async def initialize(self, config_path: str = "mcp_config.json") -> None:
+        connections, timeouts, read_caches = self._read_config(config_path)
+
+        self.close_sessions()
+        self._config_path = config_path
+        self._manifests = get_manifest_cache()
+        self._apply_config(connections, timeouts, read_caches)
+        self._breakers = {name: CircuitBreaker() for name in connections}
+        self._tools_by_server = await self._start_servers(list(connections))
+
+        self._generation += 1
+        if _health_check_interval() > 0:
+            submit_async(self._health_loop(self._generation))
+
+    async def reload(self) -> Set[str]:
+        """Re-read the config and reconnect only servers that were added, removed or changed.
+
+        Returns the names of those servers. Their tools are swapped in as one
+        update and tool-change listeners are notified.
+        """
+        connections, timeouts, read_caches = self._read_config(self._config_path)
+        old_hashes = self._hashes
+        self._apply_config(connections, timeouts, read_caches)
+        changed = {
+            name for name in old_hashes.keys() | self._hashes.keys()
+            if old_hashes.get(name) != self._hashes.get(name)
+        }
+        if not changed:
+            return changed
+
+        for name in changed:
+            self._close_server_sessions(name)
+            self._results.clear(name)
+        breakers = {name: breaker for name, breaker in self._breakers.items() if name not in changed}
+        breakers.update({name: CircuitBreaker() for name in changed if name in connections})
+        self._breakers = breakers
+
+        tools = {name: t for name, t in self._tools_by_server.items() if name not in changed}
+        tools.update(await self._start_servers([name for name in changed if name in connections]))
+        self._tools_by_server = tools
+        log(f"[MCP] Reloaded {self._config_path}; servers changed: {', '.join(sorted(changed))}")
+        self._notify_tools_changed(changed)
+        return changed
+
+    def _read_config(self, config_path: str) -> Tuple[Dict[str, dict], Dict[str, float], Dict[str, dict]]:
         with open(config_path) as f:
             cfg = json.load(f)
 
         connections: Dict[str, dict] = {}
+        timeouts: Dict[str, float] = {}
+        read_caches: Dict[str, dict] = {}
         for name, s in cfg.get("mcpServers", {}).items():
-            # Support both 'transport' and 'type' for HTTP-based servers
-            transport = s.get("transport") or ("stdio" if "command" in s else None) or ("streamable_http" if s.get("type") == "http" else None)
-            if transport == "stdio":
-                args = [_expand(x) for x in s.get("args", [])]
-                env = {k: _expand(v) for k, v in s.get("env", {}).items()}
-                connections[name] = {
-                    "transport": "stdio",
-                    "command": s["command"],
-                    "args": args,
-                    "env": env,
-                }
-            elif transport in ("sse", "streamable_http"):
-                connections[name] = {
-                    "transport": transport,
-                    "url": s["url"],
-                    **({"headers": s["headers"]} if "headers" in s else {}),
-                }
-            else:
-                raise ValueError(f"Unsupported transport: {transport}")
+            try:
+                connections[name] = self._connection(s)
+            except KeyError as e:
+                # A server missing its credentials only loses its own tools
+                log(f"[MCP] Skipping '{name}': {e}")
+                continue
+            timeouts[name] = _connect_timeout(s)
+            read_caches[name] = s.get("readCache", {})
+        return connections, timeouts, read_caches
 
+    def _apply_config(
+        self, connections: Dict[str, dict], timeouts: Dict[str, float], read_caches: Dict[str, dict]
+    ) -> None:
         self._client = MultiServerMCPClient(connections)
-        self._tools_by_server.clear()
+        self._timeouts = timeouts
+        self._hashes = {name: connection_hash(connection) for name, connection in connections.items()}
+        for name in self._results.servers() - read_caches.keys():
+            self._results.configure(name, {})
+        for name, read_cache in read_caches.items():
+            self._results.configure(name, read_cache)
+
+    async def _start_servers(self, names: List[str]) -> Dict[str, List]:
+        """Tools for each server, from the manifest cache or by connecting to it."""
+        tools: Dict[str, List] = {}
+
+        # Servers with a cached manifest are only started by their first tool call
+        cassette = get_cassette()
+        to_connect = []
+        for name in names:
+            if cassette is not None and cassette.replaying:
+                manifest = _replay_manifest(cassette, name)
+            else:
+                manifest = self._manifests.get(name, self._hashes[name]) if self._manifests else None
+            if manifest is None:
+                to_connect.append(name)
+                continue
+            _record_manifest(cassette, name, manifest)
+            tools[name] = self._build_tools(name, manifest)
+            log(f"[MCP] Registered '{name}' with {len(manifest)} cached tools; connecting on first use")
+
+        # Servers start concurrently so one slow container does not delay the rest
+        results = await asyncio.gather(
+            *(self._connect(name, self._timeouts[name]) for name in to_connect), return_exceptions=True
+        )
+        for name, result in zip(to_connect, results):
+            if isinstance(result, BaseException):
+                log(f"[MCP] Failed to connect to '{name}': {describe_error(result)}")
+                # Health checks keep retrying it with backoff
+                self._breakers[name].record_failure(result, trip=True)
+                continue
+            self._save_manifest(name, result)
+            _record_manifest(cassette, name, result)
+            tools[name] = self._build_tools(name, result)
+            log(f"[MCP] Connected to '{name}' with {len(result)} tools")
+        return tools
+
+    def add_tools_listener(self, listener: Callable[[Set[str]], None]) -> None:
+        """Call ``listener(server_names)`` whenever those servers' tools are replaced."""
+        self._listeners.append(listener)
+
+    def _notify_tools_changed(self, server_names: Set[str]) -> None:
+        for listener in list(self._listeners):
+            try:
+                listener(server_names)
+            except Exception as e:
+                log(f"[MCP] Tools listener failed: {e}")
+
+    @staticmethod
+    def _connection(s: dict) -> dict:
+        # Support both 'transport' and 'type' for HTTP-based servers
+        transport = s.get("transport") or ("stdio" if "command" in s else None) or ("streamable_http" if s.get("type") == "http" else None)
+        if transport == "stdio":
+            args = [_expand(x) for x in s.get("args", [])]
+            env = {k: _expand(v) for k, v in s.get("env", {}).items()}
+            return {
+                "transport": "stdio",
+                "command": s["command"],
+                "args": args,
+                "env": env,
+            }
+        if transport in ("sse", "streamable_http"):
+            return {
+                "transport": transport,
+                "url": s["url"],
+                **({"headers": s["headers"]} if "headers" in s else {}),
+            }
+        raise ValueError(f"Unsupported transport: {transport}")
+
+    async def _connect(self, server_name: str, timeout: float) -> List[MCPTool]:
+        """Start one server and list its tools, giving up after ``timeout`` seconds."""
+        pool = self._pool(server_name)
+        try:
+            if pool is not None:
+                # The first pooled session stays open for the tool calls that follow
+                return await pool.list_tools()
+            return await asyncio.wait_for(self._list_tools(server_name), timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"no response within {timeout:g}s") from None
+
+    async def _list_tools(self, server_name: str) -> List[MCPTool]:
+        async with self._client.session(server_name) as session:
+            return await list_session_tools(session)
+
+    def _build_tools(self, server_name: str, manifest: List[MCPTool]) -> List:
+        # Without a session the tools can still run on their own; _call normally
+        # routes them to a pooled session instead
+        connection = self._client.connections[server_name]
+        return [
+            self._wrap_tool(server_name, convert_mcp_tool_to_langchain_tool(None, tool, connection=connection))
+            for tool in manifest
+        ]
+
+    def _save_manifest(self, server_name: str, manifest: List[MCPTool]) -> None:
+        if self._manifests is None or server_name not in self._hashes:
+            return
+        cached = server_name in self._tools_by_server
+        if self._manifests.put(server_name, self._hashes[server_name], manifest) and cached:
+            log(f"[MCP] Tool manifest for '{server_name}' changed; re-initialize the registry to pick it up")
+
+    def _pool(self, server_name: str) -> Optional[SessionPool]:
+        """Session pool for this server on the running loop, or None if pooling is off."""
+        size = get_pool_size()
+        if size <= 0:
+            return None
+        loop = asyncio.get_running_loop()
+        key = (server_name, id(loop))
+        with self._pools_lock:
+            pool = self._pools.get(key)
+            # A new loop can reuse the id of a closed one
+            if pool is None or pool.loop is not loop:
+                pool = self._pools[key] = SessionPool(
+                    self._client, server_name, size,
+                    self._timeouts.get(server_name, DEFAULT_CONNECT_TIMEOUT_SECONDS),
+                    on_open=lambda manifest: self._save_manifest(server_name, manifest),
+                )
+            return pool
+
+    def _live_pools(self, server_name: str) -> List[SessionPool]:
+        with self._pools_lock:
+            for key in [key for key, pool in self._pools.items() if pool.loop.is_closed()]:
+                del self._pools[key]
+            return [pool for (name, _), pool in self._pools.items() if name == server_name]
+
+    async def _health_loop(self, generation: int) -> None:
+        """Probe servers periodically; runs on the shared background loop."""
+        while generation == self._generation:
+            await asyncio.sleep(_health_check_interval())
+            if generation != self._generation:
+                return
+            await asyncio.gather(*(self._check(name) for name in list(self._breakers)), return_exceptions=True)
+
+    async def _check(self, server_name: str) -> None:
+        breaker = self._breakers[server_name]
+        pools = self._live_pools(server_name)
+        # Servers that were never started (see the manifest cache) stay idle
+        if breaker.state == CLOSED and not pools:
+            return
+        if not breaker.allow():
+            return
+        was_down = breaker.state != CLOSED
+        try:
+            if pools:
+                probed = False
+                for pool in pools:
+                    probed |= await asyncio.wait_for(_run_on(pool.loop, pool.ping()), self._timeouts[server_name])
+                if not probed:
+                    # Every session is busy; the calls in flight report the server's health
+                    return
+            else:
+                manifest = await self._connect(server_name, self._timeouts[server_name])
+        except Exception as e:
+            breaker.record_failure(e)
+            log(f"[MCP] Health check for '{server_name}' failed: {breaker.last_error}")
+            return
+        finally:
+            # No-op once a verdict was recorded
+            breaker.release_trial()
+        breaker.record_success()
+        if was_down:
+            log(f"[MCP] Reconnected to '{server_name}'")
+        if server_name not in self._tools_by_server and not pools:
+            # The server failed at startup; its tools become available now
+            self._save_manifest(server_name, manifest)
+            self._tools_by_server = {**self._tools_by_server, server_name: self._build_tools(server_name, manifest)}
+            self._notify_tools_changed({server_name})
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """Breaker state, tool count and open sessions per configured server."""
+        return {
+            name: {
+                **breaker.snapshot(),
+                "tools": len(self._tools_by_server.get(name, [])),
+                "open_sessions": sum(pool.open_sessions for pool in self._live_pools(name)),
+            }
+            for name, breaker in self._breakers.items()
+        }
+
+    def health_gauges(self):
+        for name, breaker in list(self._breakers.items()):
+            yield ("mcp_server_up", "1 while the MCP server's circuit breaker is closed", {"server": name},
+                   1 if breaker.state == CLOSED else 0)
+
+    def _close_server_sessions(self, server_name: str) -> None:
+        with self._pools_lock:
+            keys = [key for key in self._pools if key[0] == server_name]
+            pools = [self._pools.pop(key) for key in keys]
+        for pool in pools:
+            pool.close()
+
+    def close_sessions(self) -> None:
+        """Close every pooled MCP session."""
+        with self._pools_lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+        for pool in pools:
+            pool.close()
+
+    def _wrap_tool(self, server_name: str, tool):
+        """Route the tool's execution through _call."""
+        invoke = tool.coroutine
+
+        async def coroutine(**arguments):
+            return await self._call(server_name, tool.name, arguments, lambda: invoke(**arguments))
+
+        tool.coroutine = coroutine
+        return tool
+
+    async def _call(
+        self,
+        server_name: str,
+        tool_name: str,
+        arguments: Dict[str, Any],
+        invoke: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Single entry point for every MCP tool execution."""
+        key = _request_key(server_name, tool_name, arguments)
+        cassette = get_cassette()
+        if cassette is None:
+            return await self._execute(server_name, tool_name, arguments, invoke, key)
 
-        for name in connections.keys():
-            tools = await self._client.get_tools(server_name=name)
-            self._tools_by_server[name] = tools
-            log(f"[MCP] Connected to '{name}' with {len(tools)} tools")
+        cassette_key = json.dumps(key)
+        if cassette.replaying:
+            entry = await cassette.areplay("mcp", cassette_key, f"{server_name}.{tool_name}")
+            if "error" in entry:
+                raise ToolException(entry["error"])
+            result = decode(entry["result"])
+            # Tools with response_format="content_and_artifact" return (content, artifact)
+            return tuple(result) if entry.get("tuple") else result
+        start = time.perf_counter()
+        try:
+            result = await self._execute(server_name, tool_name, arguments, invoke, key)
+        except ToolException as e:
+            cassette.record("mcp", cassette_key, {"error": str(e)}, time.perf_counter() - start)
+            raise
+        payload = {"result": encode(list(result) if isinstance(result, tuple) else result)}
+        if isinstance(result, tuple):
+            payload["tuple"] = True
+        cassette.record("mcp", cassette_key, payload, time.perf_counter() - start)
+        return result
+
+    async def _execute(
+        self,
+        server_name: str,
+        tool_name: str,
+        arguments: Dict[str, Any],
+        invoke: Callable[[], Awaitable[Any]],
+        key: tuple,
+    ) -> Any:
+        cacheable = self._results.cacheable(server_name, tool_name)
+        if cacheable:
+            result = self._results.get(server_name, tool_name, key)
+            if result is not MISS:
+                return result
+
+        breaker = self._breakers.get(server_name)
+        if breaker is not None and not breaker.allow():
+            snapshot = breaker.snapshot()
+            raise MCPServerUnavailable(
+                f"MCP server '{server_name}' is unavailable ({snapshot['last_error']}); "
+                f"retrying in {snapshot['retry_in_seconds']:g}s"
+            )
+
+        async def run() -> Any:
+            pool = self._pool(server_name)
+            timeout = _call_timeout()
+            try:
+                try:
+                    call = invoke() if pool is None else pool.call(tool_name, arguments)
+                    result = await asyncio.wait_for(call, timeout)
+                except asyncio.TimeoutError:
+                    raise TimeoutError(f"no response within {timeout:g}s") from None
+            except ToolException:
+                # The tool itself reported the error, so the server is up
+                if breaker is not None:
+                    breaker.record_success()
+                raise
+            except Exception as e:
+                if breaker is not None:
+                    breaker.record_failure(e)
+                raise
+            finally:
+                # A cancelled trial call must not leave the breaker half-open for good
+                if breaker is not None:
+                    breaker.release_trial()
+            if breaker is not None:
+                breaker.record_success()
+            return result
+
+        # Identical concurrent calls (e.g. several dashboards loading) share one request
+        result = await self._flights.ado(key, run)
+        if cacheable:
+            self._results.put(server_name, tool_name, key, result)
+        return result
 
     def get_tools(self, server_name: str) -> List:
+        requested = _requested_servers.get()
+        if requested is not None:
+            requested.add(server_name)
         return self._tools_by_server.get(server_name, [])
 
+    async def call_tool(self, server_name: str, tool_name: str, arguments: Dict[str, Any]) -> Any:
+        """Invoke one MCP tool directly, outside of a graph."""
+        for tool in self.get_tools(server_name):
+            if tool.name == tool_name:
+                return await tool.ainvoke(arguments)
+        raise KeyError(f"MCP tool '{tool_name}' not found on server '{server_name}'")
+
+
+def _replay_manifest(cassette, server_name: str) -> Optional[List[MCPTool]]:
+    entry = cassette.lookup("manifest", server_name)
+    return [MCPTool.model_validate(tool) for tool in entry["tools"]] if entry else None
+
+
+def _record_manifest(cassette, server_name: str, manifest: List[MCPTool]) -> None:
+    if cassette is not None and cassette.recording:
+        cassette.record("manifest", server_name, {"tools": [t.model_dump(mode="json", exclude_none=True) for t in manifest]})
+
+
+async def _run_on(loop: asyncio.AbstractEventLoop, coro) -> Any:
+    """Await ``coro`` on ``loop``, which may be running in another thread."""
+    if loop is asyncio.get_running_loop():
+        return await coro
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
 
 _registry = _MCPRegistry()
+register_gauge_collector(_registry.health_gauges)
+
+
+def _config_watch_enabled() -> bool:
+    return os.getenv("MCP_CONFIG_WATCH", "on").strip().lower() not in ("0", "false", "no", "off")
+
+
+def _on_config_changed(paths: List[str]) -> None:
+    # Runs on the watcher thread; the reload itself runs on the shared loop
+    def done(future) -> None:
+        if future.exception() is not None:
+            log(f"[MCP] Reloading {_registry._config_path} failed, keeping the current servers: "
+                f"{describe_error(future.exception())}")
+
+    submit_async(_registry.reload()).add_done_callback(done)
 
 
 async def init_mcp_registry(config_path: str = "mcp_config.json") -> None:
     log(f"[MCP] Initializing MCP registry from {config_path}...")
     await _registry.initialize(config_path)
     log(f"[MCP] MCP registry initialized.")
+    if _config_watch_enabled():
+        watcher = get_file_watcher()
+        watcher.unwatch(config_path)
+        watcher.watch(config_path, _on_config_changed)
+
+
+@contextmanager
+def track_mcp_servers() -> Iterator[Set[str]]:
+    """Collect the servers whose tools are requested inside the block, e.g. by a graph build."""
+    servers: Set[str] = set()
+    token = _requested_servers.set(servers)
+    try:
+        yield servers
+    finally:
+        _requested_servers.reset(token)
+
+
+def on_mcp_tools_changed(listener: Callable[[Set[str]], None]) -> None:
+    _registry.add_tools_listener(listener)
 
 
 def get_mcp_tools(server_name: str) -> List:
     return _registry.get_tools(server_name)
+
+
+async def call_mcp_tool(server_name: str, tool_name: str, arguments: Dict[str, Any]) -> Any:
+    return await _registry.call_tool(server_name, tool_name, arguments)
+
+
+def get_mcp_status() -> Dict[str, Dict[str, Any]]:
+    return _registry.status()
@@ -0,0 +1,221 @@
+"""Long-lived MCP client sessions.
+
+Tools returned by MultiServerMCPClient.get_tools() open a new session for every
+call, which for the docker-based stdio servers means starting a container per
+tool invocation. Instead, framework.mcp_registry keeps a small pool of open
+sessions per server and runs each tool call on an idle one.
+
+Each session is owned by a background task that enters the MCP client's
+context managers and holds them open until the session is closed; MCP streams
+belong to the event loop that opened them, so pools are kept per loop.
+"""
+
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from langchain_core.tools import BaseTool, ToolException
+from langchain_mcp_adapters.client import MultiServerMCPClient
+from langchain_mcp_adapters.tools import convert_mcp_tool_to_langchain_tool
+from mcp import ClientSession
+from mcp.types import Tool as MCPTool
+
+from framework.log_service import log
+
+DEFAULT_POOL_SIZE = 2
+
+
+def get_pool_size() -> int:
+    """Sessions kept per server from MCP_SESSION_POOL_SIZE; 0 opens one per call."""
+    return int(os.getenv("MCP_SESSION_POOL_SIZE", str(DEFAULT_POOL_SIZE)))
+
+
+class _PooledSession:
+    """One open MCP session and the tools bound to it."""
+
+    def __init__(self, server_name: str):
+        self.server_name = server_name
+        self.manifest: List[MCPTool] = []
+        self.tools: List[BaseTool] = []
+        self._calls: Dict[str, Callable[..., Awaitable[Any]]] = {}
+        self._session: Optional[ClientSession] = None
+        self._loop = asyncio.get_running_loop()
+        self._closing = asyncio.Event()
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    @classmethod
+    async def open(cls, client: MultiServerMCPClient, server_name: str, timeout: float) -> "_PooledSession":
+        session = cls(server_name)
+        ready = session._loop.create_future()
+        session._task = asyncio.create_task(session._hold(client, ready))
+        try:
+            await asyncio.wait_for(asyncio.shield(ready), timeout)
+        except BaseException:
+            session._task.cancel()
+            raise
+        return session
+
+    async def _hold(self, client: MultiServerMCPClient, ready: "asyncio.Future[None]") -> None:
+        try:
+            async with client.session(self.server_name) as session:
+                self._session = session
+                self.manifest = await list_session_tools(session)
+                self.tools = [convert_mcp_tool_to_langchain_tool(session, tool) for tool in self.manifest]
+                # Keep the session's own coroutines; the registry replaces tool.coroutine
+                self._calls = {tool.name: tool.coroutine for tool in self.tools}
+                ready.set_result(None)
+                await self._closing.wait()
+        except asyncio.CancelledError:
+            if not ready.done():
+                ready.cancel()
+            raise
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                log(f"[MCP] Session to '{self.server_name}' closed: {type(e).__name__}: {e}")
+
+    @property
+    def alive(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def call(self, tool_name: str, arguments: Dict[str, Any]) -> Any:
+        call = self._calls.get(tool_name)
+        if call is None:
+            raise ToolException(f"MCP tool '{tool_name}' not found on server '{self.server_name}'")
+        return await call(**arguments)
+
+    async def ping(self) -> None:
+        await self._session.send_ping()
+
+    def close(self) -> None:
+        """Ask the owning task to exit the session; safe to call from any thread."""
+        if not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._closing.set)
+
+
+async def list_session_tools(session: ClientSession) -> List[MCPTool]:
+    """All tool definitions the server exposes, following pagination."""
+    tools: List[MCPTool] = []
+    cursor = None
+    while True:
+        page = await session.list_tools(cursor)
+        tools.extend(page.tools)
+        cursor = page.nextCursor
+        if not cursor:
+            return tools
+
+
+class SessionPool:
+    """Up to ``size`` open sessions to one server, used by one event loop.
+
+    ``on_open`` is called with each newly opened session's tool manifest.
+    """
+
+    def __init__(
+        self,
+        client: MultiServerMCPClient,
+        server_name: str,
+        size: int,
+        timeout: float,
+        on_open: Optional[Callable[[List[MCPTool]], None]] = None,
+    ):
+        self.client = client
+        self.server_name = server_name
+        self.size = size
+        self.timeout = timeout
+        self.on_open = on_open
+        self.loop = asyncio.get_running_loop()
+        self._idle: List[_PooledSession] = []
+        self._open = 0
+        self._closed = False
+        self._available = asyncio.Condition()
+
+    async def _acquire(self, wait: bool = True) -> Optional[_PooledSession]:
+        """An idle or newly opened session; None if all are busy and ``wait`` is False."""
+        async with self._available:
+            while True:
+                if not wait and not (self._idle or self._open < self.size):
+                    return None
+                await self._available.wait_for(lambda: self._idle or self._open < self.size)
+                if not self._idle:
+                    self._open += 1
+                    break
+                session = self._idle.pop()
+                if session.alive:
+                    return session
+                self._open -= 1
+
+        try:
+            session = await _PooledSession.open(self.client, self.server_name, self.timeout)
+        except BaseException:
+            await self._discard(None)
+            raise
+        if self.on_open is not None:
+            self.on_open(session.manifest)
+        return session
+
+    async def _release(self, session: _PooledSession) -> None:
+        if self._closed:
+            session.close()
+            return
+        async with self._available:
+            self._idle.append(session)
+            self._available.notify()
+
+    async def _discard(self, session: Optional[_PooledSession]) -> None:
+        if session is not None:
+            session.close()
+        async with self._available:
+            self._open -= 1
+            self._available.notify()
+
+    @property
+    def open_sessions(self) -> int:
+        return self._open
+
+    async def ping(self) -> bool:
+        """Check an idle session (opening one if the pool has room); dead sessions are discarded.
+
+        Returns False without checking when every session is busy; a busy
+        server must not fail its health check, and its calls report failures.
+        """
+        session = await self._acquire(wait=False)
+        if session is None:
+            return False
+        try:
+            await asyncio.wait_for(session.ping(), self.timeout)
+        except BaseException:
+            await self._discard(session)
+            raise
+        await self._release(session)
+        return True
+
+    async def list_tools(self) -> List[MCPTool]:
+        """Open (or reuse) a session and return the server's tool definitions."""
+        session = await self._acquire()
+        await self._release(session)
+        return list(session.manifest)
+
+    async def call(self, tool_name: str, arguments: Dict[str, Any]) -> Any:
+        """Run one tool call on an idle session, opening one if the pool has room."""
+        session = await self._acquire()
+        try:
+            result = await session.call(tool_name, arguments)
+        except ToolException:
+            # The tool reported an error; the session itself is fine
+            await self._release(session)
+            raise
+        except BaseException:
+            # Transport failures and cancellation can leave the session mid-request
+            await self._discard(session)
+            raise
+        await self._release(session)
+        return result
+
+    def close(self) -> None:
+        """Close idle sessions now and busy ones as their calls finish."""
+        self._closed = True
+        for session in self._idle:
+            session.close()
+        self._idle.clear()
@@ -0,0 +1,311 @@
+"""In-process metrics for graph runs, exposed in Prometheus text format."""
+
+import abc
+import bisect
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+# Latency buckets in seconds (LLM and tool calls range from milliseconds to a minute)
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+# Payload size buckets in bytes
+DEFAULT_SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+_lock = threading.Lock()
+_metrics: Dict[str, "_Metric"] = {}
+# Callables returning (name, help, labels, value) gauge samples, evaluated at scrape time
+_gauge_collectors: List[Callable[[], Iterable[Tuple[str, str, Dict[str, str], float]]]] = []
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+class _Metric(abc.ABC):
+    type = ""
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+
+    @abc.abstractmethod
+    def render(self) -> List[str]:
+        """Sample lines in the Prometheus text format."""
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter with labels."""
+    type = "counter"
+
+    def __init__(self, name: str, help: str):
+        super().__init__(name, help)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = _label_key(labels)
+        with _lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels: Any) -> float:
+        key = _label_key(labels)
+        with _lock:
+            return self._values.get(key, 0)
+
+    def render(self) -> List[str]:
+        with _lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(key)} {value}" for key, value in items]
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram with labels."""
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: Tuple[float, ...] = DEFAULT_LATENCY_BUCKETS):
+        super().__init__(name, help)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [bucket counts..., +Inf count], sum, count
+        self._values: Dict[LabelKey, Tuple[List[int], float, int]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = _label_key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with _lock:
+            counts, total, count = self._values.get(key) or ([0] * (len(self.buckets) + 1), 0.0, 0)
+            counts[index] += 1
+            self._values[key] = (counts, total + value, count + 1)
+
+    def quantile(self, q: float, **labels: Any) -> Optional[float]:
+        """Estimate a quantile by linear interpolation within buckets."""
+        key = _label_key(labels)
+        with _lock:
+            # observe() updates the bucket list in place; copy it while holding the lock
+            entry = self._values.get(key)
+            counts, count = (list(entry[0]), entry[2]) if entry else (None, 0)
+        return self.quantile_from_counts(counts, count, q) if counts is not None else None
+
+    def quantile_from_counts(self, counts: List[int], count: int, q: float) -> Optional[float]:
+        if not count:
+            return None
+        rank = q * count
+        cumulative = 0
+        for i, bucket_count in enumerate(counts):
+            if cumulative + bucket_count >= rank and bucket_count:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.buckets[-1]
+
+    def render(self) -> List[str]:
+        lines = []
+        for key, (counts, total, count) in sorted(self.series_items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_format_labels(key, ('le', str(bound)))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(key, ('le', '+Inf'))} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+        return lines
+
+    def series_items(self) -> List[Tuple[LabelKey, Tuple[List[int], float, int]]]:
+        with _lock:
+            return [(key, (list(counts), total, count)) for key, (counts, total, count) in self._values.items()]
+
+
+def counter(name: str, help: str) -> Counter:
+    """Get or create a counter."""
+    with _lock:
+        if name not in _metrics:
+            _metrics[name] = Counter(name, help)
+        return _metrics[name]
+
+
+def histogram(name: str, help: str, buckets: Tuple[float, ...] = DEFAULT_LATENCY_BUCKETS) -> Histogram:
+    """Get or create a histogram."""
+    with _lock:
+        if name not in _metrics:
+            _metrics[name] = Histogram(name, help, buckets)
+        return _metrics[name]
+
+
+def register_gauge_collector(collector: Callable[[], Iterable[Tuple[str, str, Dict[str, str], float]]]) -> None:
+    """Register a callable that yields (name, help, labels, value) gauge samples at scrape time."""
+    with _lock:
+        _gauge_collectors.append(collector)
+
+
+def render_prometheus() -> str:
+    """Render all metrics in the Prometheus text exposition format."""
+    with _lock:
+        metrics = list(_metrics.values())
+        collectors = list(_gauge_collectors)
+
+    lines: List[str] = []
+    for metric in sorted(metrics, key=lambda m: m.name):
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.type}")
+        lines.extend(metric.render())
+
+    gauges: Dict[str, Tuple[str, List[str]]] = {}
+    for collector in collectors:
+        try:
+            samples = list(collector())
+        except Exception:
+            continue
+        for name, help, labels, value in samples:
+            gauges.setdefault(name, (help, []))[1].append(f"{name}{_format_labels(_label_key(labels))} {value}")
+    for name, (help, samples) in sorted(gauges.items()):
+        lines.append(f"# HELP {name} {help}")
+        lines.append(f"# TYPE {name} gauge")
+        lines.extend(samples)
+
+    return "\n".join(lines) + "\n"
+
+
+# ----------------------------------------------------------------------
+# Graph run metrics
+# ----------------------------------------------------------------------
+
+GRAPH_RUN_SECONDS = histogram("graph_run_duration_seconds", "Wall time of a full graph invocation")
+NODE_SECONDS = histogram("graph_node_duration_seconds", "Wall time per graph node execution")
+NODE_ERRORS = counter("graph_node_errors_total", "Graph node executions that raised")
+LLM_SECONDS = histogram("graph_llm_duration_seconds", "Wall time per LLM call")
+LLM_CALLS = counter("graph_llm_calls_total", "LLM calls made by graph nodes")
+LLM_TOKENS = counter("graph_llm_tokens_total", "LLM tokens used by graph nodes")
+TOOL_SECONDS = histogram("graph_tool_duration_seconds", "Wall time per tool invocation")
+TOOL_ERRORS = counter("graph_tool_errors_total", "Tool invocations that raised")
+TOOL_PAYLOAD_BYTES = histogram(
+    "graph_tool_payload_bytes", "Size of tool inputs and outputs", DEFAULT_SIZE_BUCKETS
+)
+
+
+def token_usage(response: Any) -> Dict[str, int]:
+    """Extract prompt/completion token counts from an LLMResult."""
+    for generations in getattr(response, "generations", []) or []:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                return {"prompt": usage.get("input_tokens", 0), "completion": usage.get("output_tokens", 0)}
+    usage = (getattr(response, "llm_output", None) or {}).get("token_usage") or {}
+    return {"prompt": usage.get("prompt_tokens", 0), "completion": usage.get("completion_tokens", 0)}
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """Records node, LLM and tool timings for one graph invocation."""
+
+    # Handlers only update in-memory counters, so run them inline instead of in an executor
+    run_inline = True
+
+    def __init__(self, graph_name: str):
+        self.graph_name = graph_name
+        # run_id -> (kind, label, start time)
+        self._runs: Dict[UUID, Tuple[str, str, float]] = {}
+
+    def _start(self, run_id: UUID, kind: str, label: str) -> None:
+        self._runs[run_id] = (kind, label, time.perf_counter())
+
+    def _finish(self, run_id: UUID) -> Optional[Tuple[str, str, float]]:
+        run = self._runs.pop(run_id, None)
+        if run is None:
+            return None
+        kind, label, start = run
+        return kind, label, time.perf_counter() - start
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        node = (metadata or {}).get("langgraph_node")
+        if parent_run_id is None:
+            self._start(run_id, "graph", self.graph_name)
+        elif node and kwargs.get("name") == node:
+            self._start(run_id, "node", node)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        finished = self._finish(run_id)
+        if not finished:
+            return
+        kind, label, elapsed = finished
+        if kind == "graph":
+            GRAPH_RUN_SECONDS.observe(elapsed, graph=self.graph_name)
+        else:
+            NODE_SECONDS.observe(elapsed, graph=self.graph_name, node=label)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        finished = self._finish(run_id)
+        if finished and finished[0] == "node":
+            NODE_ERRORS.inc(graph=self.graph_name, node=finished[1])
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, **kwargs):
+        self._start(run_id, "llm", (metadata or {}).get("langgraph_node", ""))
+
+    def on_llm_start(self, serialized, prompts, *, run_id, metadata=None, **kwargs):
+        self._start(run_id, "llm", (metadata or {}).get("langgraph_node", ""))
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        finished = self._finish(run_id)
+        if not finished:
+            return
+        _, node, elapsed = finished
+        LLM_SECONDS.observe(elapsed, graph=self.graph_name, node=node)
+        LLM_CALLS.inc(graph=self.graph_name, node=node)
+        for token_type, count in token_usage(response).items():
+            if count:
+                LLM_TOKENS.inc(count, graph=self.graph_name, node=node, type=token_type)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        finished = self._finish(run_id)
+        if finished:
+            LLM_CALLS.inc(graph=self.graph_name, node=finished[1])
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        tool = kwargs.get("name") or (serialized or {}).get("name", "unknown")
+        self._start(run_id, "tool", tool)
+        TOOL_PAYLOAD_BYTES.observe(len(str(input_str).encode("utf-8")), graph=self.graph_name, tool=tool, direction="input")
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        finished = self._finish(run_id)
+        if not finished:
+            return
+        _, tool, elapsed = finished
+        TOOL_SECONDS.observe(elapsed, graph=self.graph_name, tool=tool)
+        payload = getattr(output, "content", output)
+        TOOL_PAYLOAD_BYTES.observe(len(str(payload).encode("utf-8")), graph=self.graph_name, tool=tool, direction="output")
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        finished = self._finish(run_id)
+        if finished:
+            TOOL_ERRORS.inc(graph=self.graph_name, tool=finished[1])
+
+
+def node_summary() -> List[Dict[str, Any]]:
+    """Summarize node latency, LLM calls and tokens per (graph, node) for display."""
+    rows = []
+    for key, (counts, total, count) in sorted(NODE_SECONDS.series_items()):
+        labels = dict(key)
+        graph, node = labels.get("graph", ""), labels.get("node", "")
+        rows.append({
+            "graph": graph,
+            "node": node,
+            "runs": count,
+            "mean_seconds": total / count if count else 0.0,
+            "p95_seconds": NODE_SECONDS.quantile_from_counts(counts, count, 0.95) or 0.0,
+            "llm_calls": int(LLM_CALLS.get(graph=graph, node=node)),
+            "tokens": int(
+                LLM_TOKENS.get(graph=graph, node=node, type="prompt")
+                + LLM_TOKENS.get(graph=graph, node=node, type="completion")
+            ),
+        })
+    return rows
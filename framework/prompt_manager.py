@@ -2,6 +2,8 @@ import os
 from dotenv import load_dotenv
 from langfuse import Langfuse
 
+from framework.cassette import get_cassette
+
 load_dotenv()
 
 langfuse = Langfuse(
@@ -11,4 +13,12 @@ langfuse = Langfuse(
 )
 
 def get_prompt(name: str, label: str = "production") -> str:
-    return langfuse.get_prompt(name, label=label).prompt
\ No newline at end of file
+    cassette = get_cassette()
+    if cassette is None:
+        return langfuse.get_prompt(name, label=label).prompt
+    key = f"{name}@{label}"
+    if cassette.replaying:
+        return cassette.replay("prompt", key, f"prompt '{key}'")["prompt"]
+    prompt = langfuse.get_prompt(name, label=label).prompt
+    cassette.record("prompt", key, {"prompt": prompt})
+    return prompt
\ No newline at end of file
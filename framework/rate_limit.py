@@ -0,0 +1,255 @@
+"""Process-wide client-side rate limiting for Azure OpenAI deployments.
+
+Every chat model created by framework.llm reserves capacity here before a
+request is sent: one request from LLM_RPM and an estimated token count from
+LLM_TPM, per deployment. Callers that would exceed either budget wait their
+turn instead of all hitting the API and failing with 429.
+
+When the API still answers 429, the whole deployment pauses for the
+Retry-After period, its effective rate is halved and then recovers gradually,
+and the request is retried with jittered exponential backoff. Streamed
+requests are retried the same way until their first chunk arrives; errors
+after that reach the caller, who has already seen part of the response.
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional, Tuple
+
+import openai
+from langchain_core.messages.utils import count_tokens_approximately
+
+from framework.log_service import log
+from framework.metrics import counter, register_gauge_collector
+
+LLM_RATE_LIMITED = counter("llm_rate_limited_total", "LLM requests rejected by the API with 429")
+LLM_RETRIES = counter("llm_retries_total", "LLM requests retried after a transient error")
+
+# Errors worth retrying; the OpenAI SDK's own retries are disabled for framework models
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+# Completion size assumed when a request does not set max_tokens
+DEFAULT_COMPLETION_TOKENS = 512
+
+MIN_RATE_SCALE = 0.1
+RATE_RECOVERY_STEP = 0.05
+
+
+def _optional_rate(name: str) -> Optional[float]:
+    value = os.getenv(name, "").strip()
+    return float(value) if value and value != "0" else None
+
+
+class _Bucket:
+    """Token bucket where callers reserve capacity up front and sleep off any deficit."""
+
+    def __init__(self, per_minute: float):
+        self.per_minute = per_minute
+        self.level = per_minute
+        self.updated = time.monotonic()
+
+    def reserve(self, amount: float, scale: float, now: float) -> float:
+        rate = self.per_minute * scale / 60
+        self.level = min(self.per_minute, self.level + (now - self.updated) * rate)
+        self.updated = now
+        self.level -= amount
+        return max(0.0, -self.level / rate)
+
+
+class _DeploymentLimiter:
+    def __init__(self, rpm: Optional[float], tpm: Optional[float]):
+        self.requests = _Bucket(rpm) if rpm else None
+        self.tokens = _Bucket(tpm) if tpm else None
+        self.scale = 1.0
+        self.paused_until = 0.0
+        self.waiting = 0
+
+
+class RateLimiter:
+    """Per-deployment request and token budgets shared by the whole process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._deployments: Dict[str, _DeploymentLimiter] = {}
+        self.max_retries = int(os.getenv("LLM_MAX_RETRIES", "6"))
+        self.base_delay = float(os.getenv("LLM_RETRY_BASE_SECONDS", "1"))
+        self.max_delay = float(os.getenv("LLM_RETRY_MAX_SECONDS", "60"))
+
+    def _limiter(self, deployment: str) -> _DeploymentLimiter:
+        limiter = self._deployments.get(deployment)
+        if limiter is None:
+            limiter = self._deployments[deployment] = _DeploymentLimiter(
+                _optional_rate(f"LLM_RPM_{deployment.upper().replace('-', '_')}") or _optional_rate("LLM_RPM"),
+                _optional_rate(f"LLM_TPM_{deployment.upper().replace('-', '_')}") or _optional_rate("LLM_TPM"),
+            )
+        return limiter
+
+    def _reserve(self, deployment: str, tokens: int) -> float:
+        """Reserve capacity and return how long the caller must wait before sending."""
+        now = time.monotonic()
+        with self._lock:
+            limiter = self._limiter(deployment)
+            wait = max(0.0, limiter.paused_until - now)
+            if limiter.requests:
+                wait = max(wait, limiter.requests.reserve(1, limiter.scale, now))
+            if limiter.tokens:
+                wait = max(wait, limiter.tokens.reserve(tokens, limiter.scale, now))
+            if wait:
+                limiter.waiting += 1
+            return wait
+
+    def _done_waiting(self, deployment: str) -> None:
+        with self._lock:
+            self._limiter(deployment).waiting -= 1
+
+    def acquire(self, deployment: str, tokens: int) -> None:
+        wait = self._reserve(deployment, tokens)
+        if wait:
+            try:
+                time.sleep(wait)
+            finally:
+                self._done_waiting(deployment)
+
+    async def aacquire(self, deployment: str, tokens: int) -> None:
+        wait = self._reserve(deployment, tokens)
+        if wait:
+            try:
+                await asyncio.sleep(wait)
+            finally:
+                self._done_waiting(deployment)
+
+    def settle(self, deployment: str, estimated: int, actual: Optional[int]) -> None:
+        """Correct the token bucket with the real usage and let the rate recover."""
+        with self._lock:
+            limiter = self._limiter(deployment)
+            if limiter.tokens and actual is not None:
+                limiter.tokens.level = min(limiter.tokens.per_minute, limiter.tokens.level + estimated - actual)
+            limiter.scale = min(1.0, limiter.scale + RATE_RECOVERY_STEP)
+
+    def backoff(self, deployment: str, error: Exception, attempt: int) -> float:
+        """Record a failed attempt and return the jittered delay before retrying."""
+        delay = min(self.max_delay, self.base_delay * 2 ** attempt)
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        delay = delay * (1 + random.random() * 0.25)
+
+        LLM_RETRIES.inc(deployment=deployment, error=type(error).__name__)
+        if isinstance(error, openai.RateLimitError):
+            LLM_RATE_LIMITED.inc(deployment=deployment)
+            with self._lock:
+                limiter = self._limiter(deployment)
+                # Everyone using this deployment waits, not only the caller that got the 429
+                limiter.paused_until = max(limiter.paused_until, time.monotonic() + delay)
+                limiter.scale = max(MIN_RATE_SCALE, limiter.scale / 2)
+        return delay
+
+    def queue_depths(self) -> Iterator[Tuple[str, str, Dict[str, str], float]]:
+        with self._lock:
+            items = [(name, limiter.waiting, limiter.scale) for name, limiter in self._deployments.items()]
+        for name, waiting, scale in items:
+            yield ("llm_rate_limit_queue_depth", "LLM requests waiting for rate limit capacity", {"deployment": name}, waiting)
+            yield ("llm_rate_limit_scale", "Fraction of the configured LLM rate currently allowed", {"deployment": name}, scale)
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        if "retry-after-ms" in headers:
+            return float(headers["retry-after-ms"]) / 1000
+        if "retry-after" in headers:
+            return float(headers["retry-after"])
+    except ValueError:
+        pass
+    return None
+
+
+def estimate_tokens(messages: Any, max_tokens: Optional[int]) -> int:
+    """Rough prompt plus completion size used to reserve token budget."""
+    return count_tokens_approximately(messages) + (max_tokens or DEFAULT_COMPLETION_TOKENS)
+
+
+def call_with_retries(limiter: RateLimiter, deployment: str, tokens: int, call):
+    """Run a blocking LLM request under the rate limiter, retrying transient errors."""
+    for attempt in range(limiter.max_retries + 1):
+        limiter.acquire(deployment, tokens)
+        try:
+            return call()
+        except RETRYABLE_ERRORS as e:
+            if attempt == limiter.max_retries:
+                raise
+            delay = limiter.backoff(deployment, e, attempt)
+            log(f"[LLM] {deployment}: {type(e).__name__}, retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
+async def acall_with_retries(limiter: RateLimiter, deployment: str, tokens: int, call):
+    """Async variant of call_with_retries."""
+    for attempt in range(limiter.max_retries + 1):
+        await limiter.aacquire(deployment, tokens)
+        try:
+            return await call()
+        except RETRYABLE_ERRORS as e:
+            if attempt == limiter.max_retries:
+                raise
+            delay = limiter.backoff(deployment, e, attempt)
+            log(f"[LLM] {deployment}: {type(e).__name__}, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+
+def stream_with_retries(limiter: RateLimiter, deployment: str, tokens: int, open_stream: Callable[[], Iterator]) -> Iterator:
+    """Streaming variant of call_with_retries; retries until the first chunk is received."""
+    for attempt in range(limiter.max_retries + 1):
+        limiter.acquire(deployment, tokens)
+        stream = open_stream()
+        try:
+            first = next(stream)
+        except StopIteration:
+            return
+        except RETRYABLE_ERRORS as e:
+            if attempt == limiter.max_retries:
+                raise
+            delay = limiter.backoff(deployment, e, attempt)
+            log(f"[LLM] {deployment}: {type(e).__name__}, retrying in {delay:.1f}s")
+            time.sleep(delay)
+            continue
+        yield first
+        yield from stream
+        return
+
+
+async def astream_with_retries(
+    limiter: RateLimiter, deployment: str, tokens: int, open_stream: Callable[[], AsyncIterator]
+) -> AsyncIterator:
+    """Async variant of stream_with_retries."""
+    for attempt in range(limiter.max_retries + 1):
+        await limiter.aacquire(deployment, tokens)
+        stream = open_stream()
+        try:
+            first = await stream.__anext__()
+        except StopAsyncIteration:
+            return
+        except RETRYABLE_ERRORS as e:
+            if attempt == limiter.max_retries:
+                raise
+            delay = limiter.backoff(deployment, e, attempt)
+            log(f"[LLM] {deployment}: {type(e).__name__}, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            continue
+        yield first
+        async for chunk in stream:
+            yield chunk
+        return
+
+
+rate_limiter = RateLimiter()
+register_gauge_collector(rate_limiter.queue_depths)
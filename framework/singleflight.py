@@ -0,0 +1,175 @@
+"""In-flight request coalescing.
+
+When several callers make the same request at the same time, only the first
+(the leader) executes it; the others wait for and share its result or error.
+Nothing is cached: once the leader's call finishes, the next identical request
+runs again. Streams coalesce too: chunks are buffered as the leader's stream
+produces them and fanned out to every caller, including ones that join
+mid-stream. Used by framework.llm for chat completions (streamed or not) and
+by framework.mcp_registry for MCP tool calls. Synchronous streams are not
+coalesced. Off unless COALESCE_REQUESTS is set: coalesced callers share one
+sampled completion, which is only what they want when sampling is
+deterministic (temperature 0) or responses are cached anyway.
+"""
+
+import asyncio
+import copy
+import os
+import threading
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple, TypeVar
+
+from framework.metrics import counter
+
+T = TypeVar("T")
+
+SINGLEFLIGHT_CALLS = counter("singleflight_calls_total", "Requests that went through request coalescing")
+SINGLEFLIGHT_COALESCED = counter(
+    "singleflight_coalesced_total", "Requests served by an identical call already in flight"
+)
+
+
+def coalescing_enabled() -> bool:
+    return os.getenv("COALESCE_REQUESTS", "false").strip().lower() in ("1", "true", "yes", "on")
+
+
+class _SyncCall:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class _Broadcast:
+    """Chunks of one in-flight stream, replayed to every caller that joins it."""
+
+    def __init__(self):
+        self.chunks: List[Any] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.changed = asyncio.Event()
+
+    def notify(self) -> None:
+        # Readers wait on the event they saw; swap in a fresh one for the next change
+        changed, self.changed = self.changed, asyncio.Event()
+        changed.set()
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key.
+
+    ``kind`` labels the metrics (e.g. "llm" or "mcp"). Followers receive a deep
+    copy of the leader's result so callers can mutate what they get back.
+    """
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self._lock = threading.Lock()
+        self._sync_calls: Dict[Hashable, _SyncCall] = {}
+        self._async_calls: Dict[Tuple[int, Hashable], "asyncio.Future[Any]"] = {}
+        self._streams: Dict[Tuple[int, Hashable], _Broadcast] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """Run ``fn`` unless an identical call is in flight on another thread."""
+        if not coalescing_enabled():
+            return fn()
+        SINGLEFLIGHT_CALLS.inc(kind=self.kind)
+
+        with self._lock:
+            call = self._sync_calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._sync_calls[key] = _SyncCall()
+
+        if not leader:
+            SINGLEFLIGHT_COALESCED.inc(kind=self.kind)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._sync_calls.pop(key, None)
+            call.done.set()
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Await ``fn()`` unless an identical call is in flight on this event loop."""
+        if not coalescing_enabled():
+            return await fn()
+        SINGLEFLIGHT_CALLS.inc(kind=self.kind)
+
+        # Futures belong to one loop, so calls only coalesce within a loop
+        loop_key = (id(asyncio.get_running_loop()), key)
+        with self._lock:
+            task = self._async_calls.get(loop_key)
+            leader = task is None
+            if leader:
+                task = asyncio.ensure_future(fn())
+                self._async_calls[loop_key] = task
+                task.add_done_callback(lambda _: self._forget(loop_key, task))
+
+        if not leader:
+            SINGLEFLIGHT_COALESCED.inc(kind=self.kind)
+        # Shielded so a cancelled caller does not cancel the call for everyone else
+        result = await asyncio.shield(task)
+        return result if leader else copy.deepcopy(result)
+
+    async def astream(self, key: Hashable, fn: Callable[[], AsyncIterator[T]]) -> AsyncIterator[T]:
+        """Iterate ``fn()`` unless an identical stream is in flight on this event loop."""
+        if not coalescing_enabled():
+            async for chunk in fn():
+                yield chunk
+            return
+        SINGLEFLIGHT_CALLS.inc(kind=self.kind)
+
+        loop_key = (id(asyncio.get_running_loop()), key)
+        with self._lock:
+            stream = self._streams.get(loop_key)
+            leader = stream is None
+            if leader:
+                stream = self._streams[loop_key] = _Broadcast()
+                # Like ado, the stream runs in its own task so it completes for
+                # the remaining callers even if the leader goes away
+                asyncio.ensure_future(self._pump(loop_key, stream, fn))
+
+        if not leader:
+            SINGLEFLIGHT_COALESCED.inc(kind=self.kind)
+        index = 0
+        while True:
+            changed = stream.changed
+            if index < len(stream.chunks):
+                chunk = stream.chunks[index]
+                index += 1
+                # Every caller gets a copy: LangChain stamps its own run id on each chunk
+                yield copy.deepcopy(chunk)
+            elif stream.done:
+                if stream.error is not None:
+                    raise stream.error
+                return
+            else:
+                await changed.wait()
+
+    async def _pump(self, loop_key: Tuple[int, Hashable], stream: _Broadcast, fn: Callable[[], AsyncIterator[Any]]) -> None:
+        try:
+            async for chunk in fn():
+                stream.chunks.append(chunk)
+                stream.notify()
+        except BaseException as e:
+            stream.error = e
+        finally:
+            with self._lock:
+                if self._streams.get(loop_key) is stream:
+                    del self._streams[loop_key]
+            stream.done = True
+            stream.notify()
+
+    def _forget(self, loop_key: Tuple[int, Hashable], task: "asyncio.Future[Any]") -> None:
+        with self._lock:
+            if self._async_calls.get(loop_key) is task:
+                del self._async_calls[loop_key]
@@ -0,0 +1,272 @@
+"""Append-only ledger of LLM token usage and latency.
+
+With USAGE_LEDGER on, every LLM call made under invoke_graph is recorded in
+SQLite (USAGE_LEDGER_PATH, usage.db by default) with the graph name, thread
+id, node, deployment, prompt/completion tokens and latency, so questions like
+"which habit graph costs the most per run" can be answered locally. Rows are queued by the callback handler and written in batches by a
+background thread, so LLM calls never wait on disk I/O or a SQLite lock held
+by another process. Reports aggregate by graph or by (graph, node):
+
+    python -m framework.usage_ledger                 # per graph
+    python -m framework.usage_ledger --by node --since 24
+"""
+
+import argparse
+import atexit
+import math
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID, uuid4
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from framework.log_service import log
+from framework.metrics import token_usage
+
+USAGE_LEDGER_ENV = "USAGE_LEDGER"
+USAGE_LEDGER_PATH_ENV = "USAGE_LEDGER_PATH"
+DEFAULT_PATH = "usage.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_calls (
+    ts REAL NOT NULL,
+    run_id TEXT NOT NULL,
+    graph TEXT NOT NULL,
+    thread_id TEXT,
+    node TEXT NOT NULL,
+    deployment TEXT,
+    prompt_tokens INTEGER NOT NULL,
+    completion_tokens INTEGER NOT NULL,
+    latency_ms REAL NOT NULL,
+    error INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS llm_calls_ts ON llm_calls (ts);
+"""
+
+GROUPINGS = {
+    "graph": ("graph",),
+    "node": ("graph", "node"),
+    "deployment": ("deployment",),
+}
+
+
+def _price(name: str) -> float:
+    value = os.getenv(name, "").strip()
+    return float(value) if value else 0.0
+
+
+class UsageLedger:
+    """SQLite-backed ledger; safe to share between threads and processes."""
+
+    # Rows written per transaction by the writer thread
+    BATCH_SIZE = 256
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+        self._queue: "queue.Queue[Tuple]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+
+    def record(
+        self,
+        run_id: str,
+        graph: str,
+        thread_id: Optional[str],
+        node: str,
+        deployment: Optional[str],
+        prompt_tokens: int,
+        completion_tokens: int,
+        latency_ms: float,
+        error: bool = False,
+    ) -> None:
+        """Queue one row; it is written by the background writer thread."""
+        self._queue.put((time.time(), run_id, graph, thread_id, node, deployment,
+                         prompt_tokens, completion_tokens, latency_ms, int(error)))
+        if self._writer is None:
+            with self._writer_lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._write_loop, name="usage-ledger", daemon=True)
+                    self._writer.start()
+                    atexit.register(self.flush)
+
+    def _write_loop(self) -> None:
+        while True:
+            rows = [self._queue.get()]
+            while len(rows) < self.BATCH_SIZE:
+                try:
+                    rows.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with self._lock:
+                    self._conn.executemany("INSERT INTO llm_calls VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                    self._conn.commit()
+            except sqlite3.Error as e:
+                log(f"Failed to record LLM usage ({len(rows)} calls): {e}")
+            finally:
+                for _ in rows:
+                    self._queue.task_done()
+
+    def flush(self) -> None:
+        """Wait until every queued row has been written."""
+        if self._writer is not None:
+            self._queue.join()
+
+    def report(self, by: str = "graph", since_hours: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Aggregate calls, tokens, cost and latency percentiles per group."""
+        columns = GROUPINGS[by]
+        self.flush()
+        since = time.time() - since_hours * 3600 if since_hours else 0.0
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(columns)}, run_id, prompt_tokens, completion_tokens, latency_ms, error "
+                "FROM llm_calls WHERE ts >= ?",
+                (since,),
+            ).fetchall()
+
+        groups: Dict[Tuple, Dict[str, Any]] = {}
+        for row in rows:
+            key = tuple(row[: len(columns)])
+            run_id, prompt, completion, latency, error = row[len(columns):]
+            group = groups.setdefault(key, {"runs": set(), "prompt": 0, "completion": 0, "latencies": [], "errors": 0})
+            group["runs"].add(run_id)
+            group["prompt"] += prompt
+            group["completion"] += completion
+            group["latencies"].append(latency)
+            group["errors"] += error
+
+        input_price = _price("LLM_PRICE_INPUT_PER_1M")
+        output_price = _price("LLM_PRICE_OUTPUT_PER_1M")
+        report = []
+        for key, group in sorted(groups.items(), key=lambda item: tuple(str(k) for k in item[0])):
+            latencies = sorted(group["latencies"])
+            runs = len(group["runs"])
+            cost = (group["prompt"] * input_price + group["completion"] * output_price) / 1_000_000
+            report.append({
+                **dict(zip(columns, key)),
+                "runs": runs,
+                "calls": len(latencies),
+                "errors": group["errors"],
+                "prompt_tokens": group["prompt"],
+                "completion_tokens": group["completion"],
+                "tokens_per_run": round((group["prompt"] + group["completion"]) / runs, 1) if runs else 0.0,
+                "cost": round(cost, 6),
+                "cost_per_run": round(cost / runs, 6) if runs else 0.0,
+                "p50_latency_ms": round(_percentile(latencies, 0.50), 1),
+                "p95_latency_ms": round(_percentile(latencies, 0.95), 1),
+            })
+        return report
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    # Nearest-rank: the smallest value with at least q of the samples at or below it
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+_ledger: Optional[UsageLedger] = None
+_ledger_lock = threading.Lock()
+
+
+def ledger_enabled() -> bool:
+    return os.getenv(USAGE_LEDGER_ENV, "false").strip().lower() in ("1", "true", "yes", "on")
+
+
+def get_usage_ledger() -> UsageLedger:
+    """Return the process-wide ledger at USAGE_LEDGER_PATH."""
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = UsageLedger(os.getenv(USAGE_LEDGER_PATH_ENV, DEFAULT_PATH))
+        return _ledger
+
+
+class UsageLedgerCallbackHandler(BaseCallbackHandler):
+    """Queues one ledger row per LLM call for one graph invocation."""
+
+    run_inline = True
+
+    def __init__(self, graph_name: str, thread_id: Optional[str], ledger: Optional[UsageLedger] = None):
+        self.graph_name = graph_name
+        self.thread_id = thread_id
+        # Groups every LLM call of this invocation into one "run" for per-run costs
+        self.run_id = str(uuid4())
+        self.ledger = ledger or get_usage_ledger()
+        # LLM run_id -> (node, deployment, start time)
+        self._calls: Dict[UUID, Tuple[str, Optional[str], float]] = {}
+
+    def _start(self, run_id: UUID, metadata: Optional[Dict[str, Any]], kwargs: Dict[str, Any]) -> None:
+        metadata = metadata or {}
+        deployment = metadata.get("ls_model_name") or (kwargs.get("invocation_params") or {}).get("model")
+        self._calls[run_id] = (metadata.get("langgraph_node", ""), deployment, time.perf_counter())
+
+    def _finish(self, run_id: UUID, response: Any = None, error: bool = False) -> None:
+        call = self._calls.pop(run_id, None)
+        if call is None:
+            return
+        node, deployment, start = call
+        usage = token_usage(response) if response is not None else {}
+        # Only queues the row; this runs inline on the event loop
+        self.ledger.record(
+            self.run_id, self.graph_name, self.thread_id, node, deployment,
+            usage.get("prompt", 0), usage.get("completion", 0),
+            (time.perf_counter() - start) * 1000, error,
+        )
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, **kwargs):
+        self._start(run_id, metadata, kwargs)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, metadata=None, **kwargs):
+        self._start(run_id, metadata, kwargs)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self._finish(run_id, response)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id, error=True)
+
+
+def format_report(rows: List[Dict[str, Any]], by: str) -> str:
+    """Render report rows as a fixed-width table."""
+    columns = list(GROUPINGS[by]) + [
+        "runs", "calls", "errors", "prompt_tokens", "completion_tokens",
+        "tokens_per_run", "cost_per_run", "p50_latency_ms", "p95_latency_ms",
+    ]
+    table = [columns] + [[_cell(row[c]) for c in columns] for row in rows]
+    widths = [max(len(line[i]) for line in table) for i in range(len(columns))]
+    return "\n".join("  ".join(cell.ljust(width) for cell, width in zip(line, widths)) for line in table)
+
+
+def _cell(value: Any) -> str:
+    if isinstance(value, float):
+        return f"{value:.4f}" if value < 1 else f"{value:.1f}"
+    return str(value)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Report LLM token usage and latency from the usage ledger.")
+    parser.add_argument("--by", choices=sorted(GROUPINGS), default="graph", help="Grouping (default: graph)")
+    parser.add_argument("--since", type=float, help="Only include calls from the last N hours")
+    parser.add_argument("--path", help="Ledger file (default: USAGE_LEDGER_PATH or usage.db)")
+    args = parser.parse_args()
+
+    ledger = UsageLedger(args.path) if args.path else get_usage_ledger()
+    rows = ledger.report(by=args.by, since_hours=args.since)
+    print(format_report(rows, args.by) if rows else "No LLM calls recorded.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,15 @@
-import os
 from dotenv import load_dotenv
 from typing import Annotated, TypedDict
 
 from langchain_core.messages import AIMessage, BaseMessage, SystemMessage
 from langchain_core.runnables import RunnableConfig
-from langchain_openai import AzureChatOpenAI
 from langgraph.graph import END, START, StateGraph
 from langgraph.graph.message import add_messages
 
 from framework.prompt_manager import get_prompt
 from framework.decorators import registered_graph
+from framework.history import atrim_history
+from framework.llm import get_chat_model
 
 # this is the key for the prompt in the prompt manager which gets the Langfuse prompt
 PROMPT_KEY = "01_linear"
@@ -27,19 +27,10 @@ def init_state() -> State:
 def build_graph() -> StateGraph:
     load_dotenv()
     
-    def chat_node(state: State, config: RunnableConfig) -> State:
-        subscription_key = os.getenv("AZURE_OPENAI_API_KEY")
-        api_version = "2024-12-01-preview"
-
-        # Initialize LLM
-        llm = AzureChatOpenAI(
-            api_key=subscription_key,
-            azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-            api_version=api_version,
-            deployment_name="gpt-4o-mini"
-        )
+    async def chat_node(state: State, config: RunnableConfig) -> State:
+        llm = get_chat_model()
         # # Invoke LLM with all messages from state (add_messages handles history)
-        ai: AIMessage = llm.invoke(state["messages"], config=config)
+        ai: AIMessage = await llm.ainvoke(await atrim_history(state["messages"], config), config=config)
 
         # Return only the AI response; add_messages will append it
         return {"messages": [ai]}
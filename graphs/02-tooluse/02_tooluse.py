@@ -1,4 +1,3 @@
-import os
 from dotenv import load_dotenv
 from operator import add
 from typing import Any, Annotated, Dict, TypedDict
@@ -6,7 +5,6 @@ from typing import Any, Annotated, Dict, TypedDict
 from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
 # from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import RunnableConfig
-from langchain_openai import AzureChatOpenAI
 from langgraph.graph import END, START, StateGraph
 from langgraph.graph.message import add_messages
 from langgraph.prebuilt import ToolNode
@@ -14,6 +12,8 @@ from langgraph.prebuilt import ToolNode
 from framework.log_service import log
 from framework.prompt_manager import get_prompt
 from framework.decorators import registered_graph
+from framework.history import atrim_history
+from framework.llm import get_chat_model
 from framework.mcp_registry import get_mcp_tools
 from tools.generate_vision_image import generate_vision_image
 
@@ -43,33 +43,15 @@ def build_graph() -> StateGraph:
             *todo_tools
         ] + [generate_vision_image]  # Add your local tool here
         
-        def chat_node(state: State, config: RunnableConfig) -> State:
-            subscription_key = os.getenv("AZURE_OPENAI_API_KEY")
-            api_version = "2024-12-01-preview"
-
-            # Initialize LLM
-            llm = AzureChatOpenAI(
-                api_key=subscription_key,
-                azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-                api_version=api_version,
-                deployment_name="gpt-4o-mini"
-            ).bind_tools(all_tools)
-            ai: AIMessage = llm.invoke(state["messages"], config=config)
+        async def chat_node(state: State, config: RunnableConfig) -> State:
+            llm = get_chat_model(tools=all_tools)
+            ai: AIMessage = await llm.ainvoke(await atrim_history(state["messages"], config), config=config)
             
             return {"messages": [ai]}
 
-        def end_node(state: State, config: RunnableConfig) -> State:
-            subscription_key = os.getenv("AZURE_OPENAI_API_KEY")
-            api_version = "2024-12-01-preview"
-
-            # Initialize LLM
-            llm = AzureChatOpenAI(
-                api_key=subscription_key,
-                azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-                api_version=api_version,
-                deployment_name="gpt-4o-mini"
-            )
-            ai: AIMessage = llm.invoke(state["messages"] + [AIMessage(content="Provide a final response to the user")], config=config)
+        async def end_node(state: State, config: RunnableConfig) -> State:
+            llm = get_chat_model()
+            ai: AIMessage = await llm.ainvoke(await atrim_history(state["messages"], config) + [AIMessage(content="Provide a final response to the user")], config=config)
 
             return {"messages": [ai]}
 
@@ -1,13 +1,13 @@
-import os
 from dotenv import load_dotenv
 from typing import Annotated, TypedDict
 from langchain_core.messages import AIMessage, BaseMessage, SystemMessage
 from langchain_core.runnables import RunnableConfig
-from langchain_openai import AzureChatOpenAI
 from langgraph.graph import END, START, StateGraph
 from langgraph.graph.message import add_messages
 from langgraph.prebuilt import ToolNode
 from framework.decorators import registered_graph
+from framework.history import atrim_history
+from framework.llm import get_chat_model
 from framework.mcp_registry import get_mcp_tools
 from framework.prompt_manager import get_prompt
 
@@ -29,18 +29,9 @@ def build_graph() -> StateGraph:
         # Get GitHub MCP tools
         github_tools = get_mcp_tools("github")
         
-        def chat_node(state: State, config: RunnableConfig) -> State:
-            subscription_key = os.getenv("AZURE_OPENAI_API_KEY")
-            api_version = "2024-12-01-preview"
-
-            # Initialize LLM
-            llm = AzureChatOpenAI(
-                api_key=subscription_key,
-                azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-                api_version=api_version,
-                deployment_name="gpt-4o-mini"
-            ).bind_tools(github_tools)
-            ai: AIMessage = llm.invoke(state["messages"], config=config)
+        async def chat_node(state: State, config: RunnableConfig) -> State:
+            llm = get_chat_model(tools=github_tools)
+            ai: AIMessage = await llm.ainvoke(await atrim_history(state["messages"], config), config=config)
             return {"messages": [ai]}
 
         def github_info_node(state: State, config: RunnableConfig) -> State:
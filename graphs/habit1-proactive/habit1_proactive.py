@@ -4,11 +4,12 @@ from dotenv import load_dotenv
 from typing import Annotated, TypedDict
 from langchain_core.messages import AIMessage, BaseMessage, SystemMessage
 from langchain_core.runnables import RunnableConfig
-from langchain_openai import AzureChatOpenAI
 from langgraph.graph import END, START, StateGraph
 from langgraph.graph.message import add_messages
 from langgraph.prebuilt import ToolNode
 from framework.decorators import registered_graph
+from framework.history import atrim_history
+from framework.llm import get_chat_model
 from framework.mcp_registry import get_mcp_tools
 from framework.prompt_manager import get_prompt
 from framework.log_service import log
@@ -49,16 +50,9 @@ def build_graph() -> StateGraph:
     try:
         github_tools = get_mcp_tools("github")
 
-        def search_repositories_node(state: State, config: RunnableConfig) -> State:
+        async def search_repositories_node(state: State, config: RunnableConfig) -> State:
             """Search for agentic/MCP repositories and extract real URLs"""
-            subscription_key = os.getenv("AZURE_OPENAI_API_KEY")
-            api_version = "2024-12-01-preview"
-            llm = AzureChatOpenAI(
-                api_key=subscription_key,
-                azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-                api_version=api_version,
-                deployment_name="gpt-4o-mini"
-            ).bind_tools([tool for tool in github_tools if tool.name == "search_repositories"])
+            llm = get_chat_model(tools=[tool for tool in github_tools if tool.name == "search_repositories"], cache=True)
             
             search_prompt = """Search for repositories related to agentic AI and MCP (Model Context Protocol).
             
@@ -69,19 +63,12 @@ def build_graph() -> StateGraph:
             
             Use the search_repositories tool to find these repositories."""
             
-            ai: AIMessage = llm.invoke(state["messages"] + [SystemMessage(content=search_prompt)], config=config)
+            ai: AIMessage = await llm.ainvoke(await atrim_history(state["messages"], config) + [SystemMessage(content=search_prompt)], config=config)
             return {"messages": [ai]}
 
-        def search_issues_node(state: State, config: RunnableConfig) -> State:
+        async def search_issues_node(state: State, config: RunnableConfig) -> State:
             """Search for beginner-friendly issues and extract real URLs"""
-            subscription_key = os.getenv("AZURE_OPENAI_API_KEY")
-            api_version = "2024-12-01-preview"
-            llm = AzureChatOpenAI(
-                api_key=subscription_key,
-                azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-                api_version=api_version,
-                deployment_name="gpt-4o-mini"
-            ).bind_tools([tool for tool in github_tools if tool.name == "search_issues"])
+            llm = get_chat_model(tools=[tool for tool in github_tools if tool.name == "search_issues"], cache=True)
             
             issues_prompt = """Search for beginner-friendly issues in agentic AI repositories.
             
@@ -92,19 +79,12 @@ def build_graph() -> StateGraph:
             
             Use the search_issues tool to find these issues."""
             
-            ai: AIMessage = llm.invoke(state["messages"] + [SystemMessage(content=issues_prompt)], config=config)
+            ai: AIMessage = await llm.ainvoke(await atrim_history(state["messages"], config) + [SystemMessage(content=issues_prompt)], config=config)
             return {"messages": [ai]}
 
-        def collect_documentation_node(state: State, config: RunnableConfig) -> State:
+        async def collect_documentation_node(state: State, config: RunnableConfig) -> State:
             """Get documentation files from repositories and extract real URLs"""
-            subscription_key = os.getenv("AZURE_OPENAI_API_KEY")
-            api_version = "2024-12-01-preview"
-            llm = AzureChatOpenAI(
-                api_key=subscription_key,
-                azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-                api_version=api_version,
-                deployment_name="gpt-4o-mini"
-            ).bind_tools([tool for tool in github_tools if tool.name == "get_file_contents"])
+            llm = get_chat_model(tools=[tool for tool in github_tools if tool.name == "get_file_contents"], cache=True)
             
             docs_prompt = """Get documentation files from key repositories to understand contribution guidelines.
             
@@ -115,7 +95,7 @@ def build_graph() -> StateGraph:
             
             Use the get_file_contents tool to retrieve these files."""
             
-            ai: AIMessage = llm.invoke(state["messages"] + [SystemMessage(content=docs_prompt)], config=config)
+            ai: AIMessage = await llm.ainvoke(await atrim_history(state["messages"], config) + [SystemMessage(content=docs_prompt)], config=config)
             return {"messages": [ai]}
 
         def extract_data_node(state: State, config: RunnableConfig) -> State:
@@ -5,11 +5,12 @@ from dotenv import load_dotenv
 from typing import Annotated, TypedDict
 from langchain_core.messages import AIMessage, BaseMessage, SystemMessage
 from langchain_core.runnables import RunnableConfig
-from langchain_openai import AzureChatOpenAI
 from langgraph.graph import END, START, StateGraph
 from langgraph.graph.message import add_messages
 from langgraph.prebuilt import ToolNode
 from framework.decorators import registered_graph
+from framework.history import atrim_history
+from framework.llm import get_chat_model
 from framework.mcp_registry import get_mcp_tools
 from framework.prompt_manager import get_prompt
 from framework.log_service import log
@@ -44,16 +45,9 @@ def build_graph() -> StateGraph:
     try:
         github_tools = get_mcp_tools("github")
 
-        def data_collection_node(state: State, config: RunnableConfig) -> State:
+        async def data_collection_node(state: State, config: RunnableConfig) -> State:
             """Collect data focused on win-win collaboration and mutual benefit"""
-            subscription_key = os.getenv("AZURE_OPENAI_API_KEY")
-            api_version = "2024-12-01-preview"
-            llm = AzureChatOpenAI(
-                api_key=subscription_key,
-                azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-                api_version=api_version,
-                deployment_name="gpt-4o-mini"
-            ).bind_tools(github_tools)
+            llm = get_chat_model(tools=github_tools, cache=True)
             
             research_prompt = """
 Search for repositories and projects that demonstrate win-win collaboration, mutual benefit, and positive-sum patterns in LLMs, agentic AI, and advanced AI systems.
@@ -75,7 +69,7 @@ Use these specific search queries:
 Focus on finding examples where collaboration, mutual benefit, and win-win outcomes are core to the project's culture and process.
 """
             research_message = SystemMessage(content=research_prompt)
-            ai: AIMessage = llm.invoke(state["messages"] + [research_message], config=config)
+            ai: AIMessage = await llm.ainvoke(await atrim_history(state["messages"], config) + [research_message], config=config)
             return {"messages": [ai]}
 
         def link_extraction_node(state: State, config: RunnableConfig) -> State:
@@ -102,16 +96,9 @@ Focus on finding examples where collaboration, mutual benefit, and win-win outco
                 "winwin_examples": winwin_examples
             }
 
-        def synthesize_node(state: State, config: RunnableConfig) -> State:
+        async def synthesize_node(state: State, config: RunnableConfig) -> State:
             """Synthesize findings into a comprehensive summary with actual GitHub links"""
-            subscription_key = os.getenv("AZURE_OPENAI_API_KEY")
-            api_version = "2024-12-01-preview"
-            llm = AzureChatOpenAI(
-                api_key=subscription_key,
-                azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-                api_version=api_version,
-                deployment_name="gpt-4o-mini"
-            )
+            llm = get_chat_model()
             
             github_links_markdown = format_github_links_for_markdown(
                 state.get("github_links", []), 
@@ -131,7 +118,7 @@ Focus on finding examples where collaboration, mutual benefit, and win-win outco
             
             synthesis_prompt = f"""Based on the research conducted, create a comprehensive markdown summary focused on Habit 4 - Think Win-Win, with a special emphasis on collaboration, mutual benefit, and positive-sum patterns in LLMs, agentic AI, and advanced AI systems.\n\nStructure the summary as follows:\n\n# Habit 4 - Think Win-Win: Collaboration & Mutual Benefit in LLMs/Agentic AI\n\n**Generated on:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n## 🤝 Focus: Collaboration, Mutual Benefit, and Win-Win Outcomes in LLMs/Agentic AI\n\n### Overview\nSummarize the key findings related to collaboration, mutual benefit, and win-win patterns in LLM/agentic/AI projects.\n\n### Collaboration & Consensus Champions\n[List repositories that excel at collaborative issue resolution, PRs, and consensus building in LLM/agentic AI]\n\n### Mutual Benefit & Synergy Examples\n[Document projects that foster mutual benefit, team synergy, and positive-sum outcomes in LLM/agentic AI]\n\n### Shared Learning & Open Collaboration\n[Highlight projects that encourage shared learning, resource sharing, and open collaboration in LLM/agentic AI communities]\n\n{winwin_examples_text}\n\n{github_links_markdown}\n\n## 📖 Documentation & Communication Patterns\n[Document patterns that highlight win-win solutions and positive-sum outcomes in LLM/agentic AI projects]\n\n### Action Items for Better Collaboration & Mutual Benefit\n\n#### This Week\n1. [Collaborate on an issue or PR in an LLM/agentic AI project]\n2. [Participate in a consensus-building discussion]\n3. [Share a resource or learning with the community]\n\n#### This Month\n1. [Contribute to a project with a strong collaboration culture]\n2. [Propose a win-win solution in an LLM/agentic AI repo]\n3. [Document a positive-sum outcome or shared success]\n\n---\n\nFocus on concrete examples and actionable patterns that foster collaboration, mutual benefit, and win-win outcomes in LLMs, agentic AI, and advanced AI systems.\n"""
             synthesis_message = SystemMessage(content=synthesis_prompt)
-            ai: AIMessage = llm.invoke(state["messages"] + [synthesis_message], config=config)
+            ai: AIMessage = await llm.ainvoke(await atrim_history(state["messages"], config) + [synthesis_message], config=config)
             return {
                 "messages": [ai],
                 "summary": ai.content
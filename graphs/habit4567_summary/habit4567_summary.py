@@ -5,11 +5,12 @@ from dotenv import load_dotenv
 from typing import Annotated, TypedDict
 from langchain_core.messages import AIMessage, BaseMessage, SystemMessage
 from langchain_core.runnables import RunnableConfig
-from langchain_openai import AzureChatOpenAI
 from langgraph.graph import END, START, StateGraph
 from langgraph.graph.message import add_messages
 from langgraph.prebuilt import ToolNode
 from framework.decorators import registered_graph
+from framework.history import atrim_history
+from framework.llm import get_chat_model
 
 from framework.mcp_registry import get_mcp_tools
 from framework.prompt_manager import get_prompt
@@ -40,16 +41,9 @@ def build_graph() -> StateGraph:
     try:
         github_tools = get_mcp_tools("github")
 
-        def research_node(state: State, config: RunnableConfig) -> State:
+        async def research_node(state: State, config: RunnableConfig) -> State:
             """Research GitHub repositories for Habits 4-7 content"""
-            subscription_key = os.getenv("AZURE_OPENAI_API_KEY")
-            api_version = "2024-12-01-preview"
-            llm = AzureChatOpenAI(
-                api_key=subscription_key,
-                azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-                api_version=api_version,
-                deployment_name="gpt-4o-mini"
-            )
+            llm = get_chat_model(cache=True)
             research_prompt = """
 Research and analyze repositories and patterns related to the following 7 Habits:
 
@@ -82,19 +76,12 @@ Use get_file_contents to examine specific documentation like CONTRIBUTING.md, AD
 Focus on finding concrete examples and patterns that demonstrate these habits in action.
 """
             research_message = SystemMessage(content=research_prompt)
-            ai: AIMessage = llm.invoke(state["messages"] + [research_message], config=config)
+            ai: AIMessage = await llm.ainvoke(await atrim_history(state["messages"], config) + [research_message], config=config)
             return {"messages": [ai]}
 
-        def synthesize_node(state: State, config: RunnableConfig) -> State:
+        async def synthesize_node(state: State, config: RunnableConfig) -> State:
             """Synthesize research results into a summary for Habits 4-7"""
-            subscription_key = os.getenv("AZURE_OPENAI_API_KEY")
-            api_version = "2024-12-01-preview"
-            llm = AzureChatOpenAI(
-                api_key=subscription_key,
-                azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-                api_version=api_version,
-                deployment_name="gpt-4o-mini"
-            )
+            llm = get_chat_model()
             synthesis_prompt = f"""Based on the research conducted, create a comprehensive markdown summary for Habits 4-7 covering collaborative and growth-focused development practices.
 
 Structure the summary as follows:
@@ -166,7 +153,7 @@ Structure the summary as follows:
 Focus on concrete, actionable insights that promote collaboration, understanding, synergy, and continuous learning. Provide specific examples with repository links where possible.
 """
             synthesis_message = SystemMessage(content=synthesis_prompt)
-            ai: AIMessage = llm.invoke(state["messages"] + [synthesis_message], config=config)
+            ai: AIMessage = await llm.ainvoke(await atrim_history(state["messages"], config) + [synthesis_message], config=config)
             return {
                 "messages": [ai],
                 "summary": ai.content
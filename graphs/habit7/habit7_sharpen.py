@@ -5,11 +5,12 @@ from dotenv import load_dotenv
 from typing import Annotated, TypedDict
 from langchain_core.messages import AIMessage, BaseMessage, SystemMessage
 from langchain_core.runnables import RunnableConfig
-from langchain_openai import AzureChatOpenAI
 from langgraph.graph import END, START, StateGraph
 from langgraph.graph.message import add_messages
 from langgraph.prebuilt import ToolNode
 from framework.decorators import registered_graph
+from framework.history import atrim_history
+from framework.llm import get_chat_model
 from framework.mcp_registry import get_mcp_tools
 # from framework.prompt_manager import get_prompt
 from framework.log_service import log
@@ -61,16 +62,9 @@ def build_graph() -> StateGraph:
     try:
         github_tools = get_mcp_tools("github")
 
-        def data_collection_node(state: State, config: RunnableConfig) -> State:
+        async def data_collection_node(state: State, config: RunnableConfig) -> State:
             """Collect data focused on learning and growth opportunities"""
-            subscription_key = os.getenv("AZURE_OPENAI_API_KEY")
-            api_version = "2024-12-01-preview"
-            llm = AzureChatOpenAI(
-                api_key=subscription_key,
-                azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-                api_version=api_version,
-                deployment_name="gpt-4o-mini"
-            ).bind_tools(github_tools)
+            llm = get_chat_model(tools=github_tools, cache=True)
             
             research_prompt = """
 Search for repositories and opportunities that promote continuous learning and skill development in Large Language Models (LLMs), agentic AI, and autonomous agent systems.
@@ -93,7 +87,7 @@ Use these specific search queries:
 Focus on finding concrete learning opportunities and growth resources in LLMs, agentic AI, and autonomous agent development.
 """
             research_message = SystemMessage(content=research_prompt)
-            ai: AIMessage = llm.invoke(state["messages"] + [research_message], config=config)
+            ai: AIMessage = await llm.ainvoke(await atrim_history(state["messages"], config) + [research_message], config=config)
             return {"messages": [ai]}
 
         def link_extraction_node(state: State, config: RunnableConfig) -> State:
@@ -120,16 +114,9 @@ Focus on finding concrete learning opportunities and growth resources in LLMs, a
                 "learning_opportunities": learning_opportunities
             }
 
-        def synthesize_node(state: State, config: RunnableConfig) -> State:
+        async def synthesize_node(state: State, config: RunnableConfig) -> State:
             """Synthesize findings into a comprehensive summary with actual GitHub links"""
-            subscription_key = os.getenv("AZURE_OPENAI_API_KEY")
-            api_version = "2024-12-01-preview"
-            llm = AzureChatOpenAI(
-                api_key=subscription_key,
-                azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-                api_version=api_version,
-                deployment_name="gpt-4o-mini"
-            )
+            llm = get_chat_model()
             
             github_links_markdown = format_github_links_for_markdown(
                 state.get("github_links", []), 
@@ -207,7 +194,7 @@ Summarize the key findings related to LLMs, agentic AI, and autonomous agent lea
 Focus on concrete learning opportunities that promote continuous skill development and professional growth in LLMs, agentic AI, and autonomous agent systems.
 """
             synthesis_message = SystemMessage(content=synthesis_prompt)
-            ai: AIMessage = llm.invoke(state["messages"] + [synthesis_message], config=config)
+            ai: AIMessage = await llm.ainvoke(await atrim_history(state["messages"], config) + [synthesis_message], config=config)
             return {
                 "messages": [ai],
                 "summary": ai.content
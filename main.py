@@ -1,17 +1,35 @@
 import os
 import sys
-import asyncio
+import argparse
 from dotenv import load_dotenv
+from framework.async_runner import run_async
 from framework.chat_ui import run_chat_ui
+from framework.graph_manager import warm_up_graphs, format_warmup_report, watch_graph_files
 from framework.mcp_registry import init_mcp_registry
 
 async def init_app() -> None:
     await init_mcp_registry()
+    watch_graph_files()
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="LangGraph Chat Workshop terminal UI")
+    parser.add_argument(
+        "--warm-up",
+        nargs="*",
+        metavar="GRAPH",
+        help="Precompile graphs before starting the UI (all graphs if no names are given)",
+    )
+    return parser.parse_args()
 
 def main() -> None:
+    args = parse_args()
     load_dotenv()
-    asyncio.run(init_app())
+    # MCP sessions and HTTP pools bind to the loop they are opened on, so use the
+    # shared loop that the chat UI also runs graphs on
+    run_async(init_app())
+    if args.warm_up is not None:
+        print(format_warmup_report(warm_up_graphs(args.warm_up or None)))
     run_chat_ui()
 
 if __name__ == "__main__":      
-    main()
\ No newline at end of file
+    main()
@@ -311,29 +311,15 @@ class VisionBoardApp {
         this.messageInput.value = '';
 
         try {
-            const response = await fetch('/api/chat', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json'
-                },
-                body: JSON.stringify({
-                    message: message,
-                    session_id: this.currentSessionId
-                })
-            });
+            const streamed = await this.streamMessage(message);
+            if (!streamed) {
+                await this.postMessage(message);
+            }
 
-            const data = await response.json();
-            if (response.ok) {
-                this.currentSessionId = data.session_id;
-                this.addMessage('assistant', data.response);
-                
-                // Check if message might have generated an image
-                if (this.isImageGenerationMessage(message)) {
-                    // Refresh images after a short delay to allow for image generation
-                    setTimeout(() => this.refreshImages(), 2000);
-                }
-            } else {
-                this.addMessage('assistant', `Error: ${data.error}`);
+            // Check if message might have generated an image
+            if (this.isImageGenerationMessage(message)) {
+                // Refresh images after a short delay to allow for image generation
+                setTimeout(() => this.refreshImages(), 2000);
             }
         } catch (error) {
             console.error('Error sending message:', error);
@@ -344,6 +330,109 @@ class VisionBoardApp {
         }
     }
 
+    async postMessage(message) {
+        const response = await fetch('/api/chat', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({
+                message: message,
+                session_id: this.currentSessionId
+            })
+        });
+
+        const data = await response.json();
+        if (response.ok) {
+            this.currentSessionId = data.session_id;
+            this.addMessage('assistant', data.response);
+        } else {
+            this.addMessage('assistant', `Error: ${data.error}`);
+        }
+    }
+
+    // Stream the reply over Server-Sent Events; returns false if streaming is unavailable
+    async streamMessage(message) {
+        const response = await fetch('/api/chat/stream', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'Accept': 'text/event-stream'
+            },
+            body: JSON.stringify({
+                message: message,
+                session_id: this.currentSessionId
+            })
+        });
+
+        if (!response.ok || !response.body) {
+            return false;
+        }
+
+        const messageDiv = this.addMessage('assistant', '');
+        const contentEl = messageDiv.querySelector('.message-text');
+        const statusEl = messageDiv.querySelector('.message-status');
+        let text = '';
+
+        const handleEvent = (type, data) => {
+            switch (type) {
+                case 'session':
+                    this.currentSessionId = data.session_id;
+                    break;
+                case 'node_start':
+                    // Each LLM node starts a fresh draft; the final event has the definitive answer
+                    text = '';
+                    break;
+                case 'token':
+                    text += data.content;
+                    contentEl.textContent = text;
+                    this.showLoading(false);
+                    break;
+                case 'tool_start':
+                    statusEl.textContent = `Running ${data.tool}...`;
+                    statusEl.style.display = 'block';
+                    break;
+                case 'tool_end':
+                    statusEl.textContent = `Finished ${data.tool}`;
+                    break;
+                case 'final':
+                    contentEl.textContent = data.content;
+                    statusEl.style.display = 'none';
+                    break;
+                case 'error':
+                    contentEl.textContent = `Error: ${data.error}`;
+                    statusEl.style.display = 'none';
+                    break;
+            }
+            this.scrollToBottom();
+        };
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+
+            // SSE frames are separated by a blank line
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const frame = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+
+                let type = 'message';
+                let data = '';
+                for (const line of frame.split('\n')) {
+                    if (line.startsWith('event: ')) type = line.slice(7);
+                    else if (line.startsWith('data: ')) data += line.slice(6);
+                }
+                if (data) handleEvent(type, JSON.parse(data));
+            }
+        }
+        return true;
+    }
+
     isImageGenerationMessage(message) {
         const imageKeywords = [
             'add image', 'create image', 'generate image', 'vision board',
@@ -362,8 +451,9 @@ class VisionBoardApp {
         
         messageDiv.innerHTML = `
             <div class="message-content">
-                ${type === 'user' ? '<strong>You:</strong>' : '<strong>AI Assistant:</strong>'} ${this.escapeHtml(content)}
+                ${type === 'user' ? '<strong>You:</strong>' : '<strong>AI Assistant:</strong>'} <span class="message-text">${this.escapeHtml(content)}</span>
             </div>
+            <div class="message-status"></div>
             <div class="message-time">
                 <small class="text-muted">${timeStr}</small>
             </div>
@@ -371,6 +461,7 @@ class VisionBoardApp {
         
         this.chatMessages.appendChild(messageDiv);
         this.scrollToBottom();
+        return messageDiv;
     }
 
     setInputEnabled(enabled) {
@@ -8,17 +8,20 @@ Provides a web interface with:
 """
 
 import os
-import asyncio
+import queue
 import uuid
 from pathlib import Path
-from typing import List, Dict, Any
-from flask import Flask, render_template, request, jsonify, send_from_directory
+from typing import List, Dict, Any, Tuple
+from flask import Flask, Response, render_template, request, jsonify, send_from_directory, stream_with_context
 from datetime import datetime
 import json
 
 # Import existing framework components
-from framework.graph_manager import invoke_graph
-from framework.mcp_registry import init_mcp_registry
+from framework.async_runner import run_async, submit_async
+from framework.graph_manager import invoke_graph, invoke_graph_stream, warm_up_graphs, format_warmup_report, watch_graph_files
+from framework.mcp_registry import get_mcp_status, init_mcp_registry
+from framework.metrics import render_prometheus
+from framework.usage_ledger import GROUPINGS, get_usage_ledger
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -35,6 +38,21 @@ DATA_DIR.mkdir(parents=True, exist_ok=True)
 # Global state for chat sessions
 chat_sessions: Dict[str, Dict[str, Any]] = {}
 
+def get_chat_session(session_id: str | None) -> Tuple[str, Dict[str, Any]]:
+    """Return the chat session for an id, creating a new one if it does not exist."""
+    if not session_id:
+        session_id = str(uuid.uuid4())
+    
+    session = chat_sessions.get(session_id)
+    if not session:
+        session = {
+            'thread_id': str(uuid.uuid4()),
+            'is_new_thread': True,
+            'messages': []
+        }
+        chat_sessions[session_id] = session
+    return session_id, session
+
 def get_image_files() -> List[Dict[str, Any]]:
     """Get all image files from data directory with metadata."""
     image_extensions = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp'}
@@ -73,6 +91,25 @@ def api_images():
     images = get_image_files()
     return jsonify({'images': images})
 
+@app.route('/metrics')
+def metrics():
+    """Expose graph run metrics in the Prometheus text format."""
+    return Response(render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/mcp/status')
+def api_mcp_status():
+    """Health, circuit breaker state and open sessions of each MCP server."""
+    return jsonify({'servers': get_mcp_status()})
+
+@app.route('/api/usage')
+def api_usage():
+    """LLM token usage, cost and latency percentiles from the usage ledger."""
+    by = request.args.get('by', 'graph')
+    if by not in GROUPINGS:
+        return jsonify({'error': f"'by' must be one of {sorted(GROUPINGS)}"}), 400
+    since = request.args.get('since', type=float)
+    return jsonify({'by': by, 'rows': get_usage_ledger().report(by=by, since_hours=since)})
+
 @app.route('/data/<path:filename>')
 def serve_image(filename):
     """Serve images from data directory."""
@@ -225,23 +262,7 @@ def api_chat():
         if not message:
             return jsonify({'error': 'Message cannot be empty'}), 400
         
-        session_id = data.get('session_id')
-        if not session_id:
-            session_id = str(uuid.uuid4())
-            chat_sessions[session_id] = {
-                'thread_id': str(uuid.uuid4()),
-                'is_new_thread': True,
-                'messages': []
-            }
-        
-        session = chat_sessions.get(session_id)
-        if not session:
-            session = {
-                'thread_id': str(uuid.uuid4()),
-                'is_new_thread': True,
-                'messages': []
-            }
-            chat_sessions[session_id] = session
+        session_id, session = get_chat_session(data.get('session_id'))
         
         # Add user message to session
         session['messages'].append({
@@ -252,19 +273,14 @@ def api_chat():
         
         # Process message through the 02-tooluse graph
         try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                response = loop.run_until_complete(
-                    invoke_graph(
-                        graph_name='02-tooluse',
-                        message=message,
-                        thread_id=session['thread_id'],
-                        is_new_thread=session['is_new_thread']
-                    )
+            response = run_async(
+                invoke_graph(
+                    graph_name='02-tooluse',
+                    message=message,
+                    thread_id=session['thread_id'],
+                    is_new_thread=session['is_new_thread']
                 )
-            finally:
-                loop.close()
+            )
         except Exception as graph_error:
             # Fallback response when graph is not available
             print(f"Graph error: {graph_error}")
@@ -292,6 +308,91 @@ def api_chat():
     except Exception as e:
         return jsonify({'error': f'Failed to process message: {str(e)}'}), 500
 
+def sse_event(event_type: str, payload: Dict[str, Any]) -> str:
+    """Format a Server-Sent Events frame."""
+    return f"event: {event_type}\ndata: {json.dumps(payload, default=str)}\n\n"
+
+# Seconds between keep-alive comments while a long tool call is running
+SSE_KEEPALIVE_SECONDS = 15
+# Tool outputs can be large (file contents, API payloads); only preview them
+SSE_TOOL_OUTPUT_PREVIEW = 300
+
+@app.route('/api/chat/stream', methods=['POST'])
+def api_chat_stream():
+    """Handle chat requests, streaming tokens and tool progress as Server-Sent Events."""
+    data = request.get_json()
+    if not data or 'message' not in data:
+        return jsonify({'error': 'Message is required'}), 400
+    
+    message = data['message'].strip()
+    if not message:
+        return jsonify({'error': 'Message cannot be empty'}), 400
+    
+    session_id, session = get_chat_session(data.get('session_id'))
+    session['messages'].append({
+        'type': 'user',
+        'content': message,
+        'timestamp': datetime.now().isoformat()
+    })
+    
+    events: "queue.Queue[Dict[str, Any] | None]" = queue.Queue()
+    
+    async def pump_events():
+        async for event in invoke_graph_stream(
+            graph_name='02-tooluse',
+            message=message,
+            thread_id=session['thread_id'],
+            is_new_thread=session['is_new_thread']
+        ):
+            events.put(event)
+    
+    def on_done(future):
+        # The graph runs on the shared loop so the response can flush as events arrive
+        error = future.exception()
+        if error is not None:
+            print(f"Graph error: {error}")
+            events.put({'type': 'error', 'error': str(error)})
+        events.put(None)
+    
+    submit_async(pump_events()).add_done_callback(on_done)
+    
+    def generate():
+        yield sse_event('session', {'session_id': session_id})
+        response = None
+        while True:
+            try:
+                event = events.get(timeout=SSE_KEEPALIVE_SECONDS)
+            except queue.Empty:
+                yield ": keep-alive\n\n"
+                continue
+            if event is None:
+                break
+            
+            event_type = event.pop('type')
+            if event_type == 'tool_end':
+                output = str(event.get('output', ''))
+                event['output'] = output[:SSE_TOOL_OUTPUT_PREVIEW]
+            elif event_type == 'final':
+                response = event['content']
+            elif event_type == 'error':
+                response = f"I'm sorry, but I'm currently unable to process your request. Error: {event['error']}"
+            yield sse_event(event_type, event)
+        
+        if response is not None:
+            session['is_new_thread'] = False
+            session['messages'].append({
+                'type': 'assistant',
+                'content': response,
+                'timestamp': datetime.now().isoformat()
+            })
+        yield sse_event('done', {'session_id': session_id, 'message_count': len(session['messages'])})
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @app.route('/api/chat/new', methods=['POST'])
 def api_new_chat():
     """Start a new chat session."""
@@ -319,7 +420,7 @@ async def fetch_real_github_data():
     """Fetch real GitHub data using MCP tools."""
     try:
         # Import here to avoid issues if MCP is not available
-        from framework.mcp_registry import get_mcp_tools, _registry
+        from framework.mcp_registry import call_mcp_tool, get_mcp_tools
         
         # Default repository information
         owner = "jaganraajan"
@@ -330,21 +431,21 @@ async def fetch_real_github_data():
         if not github_tools:
             return None
         
-        # Use the MCP client to get real data
-        commits_result = await _registry._client.call_tool(
-            server_name="github",
-            tool_name="list_commits",
-            arguments={
+        # Go through the registry so concurrent dashboard requests share in-flight calls
+        commits_result = await call_mcp_tool(
+            "github",
+            "list_commits",
+            {
                 "owner": owner,
                 "repo": repo_name,
                 "perPage": 5
             }
         )
         
-        prs_result = await _registry._client.call_tool(
-            server_name="github", 
-            tool_name="list_pull_requests",
-            arguments={
+        prs_result = await call_mcp_tool(
+            "github", 
+            "list_pull_requests",
+            {
                 "owner": owner,
                 "repo": repo_name,
                 "state": "all",
@@ -371,12 +472,7 @@ def api_github_activity():
         repo_name = "7-habits-agent-graph"
         
         # Try to fetch real GitHub data
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            real_data = loop.run_until_complete(fetch_real_github_data())
-        finally:
-            loop.close()
+        real_data = run_async(fetch_real_github_data())
         
         if real_data:
             return jsonify(real_data)
@@ -464,19 +560,14 @@ Commits ({len(commits)} total):
                 'messages': []
             }
             
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                response = loop.run_until_complete(
-                    invoke_graph(
-                        graph_name='02-tooluse',
-                        message=summary_prompt,
-                        thread_id=chat_sessions[session_id]['thread_id'],
-                        is_new_thread=True
-                    )
+            response = run_async(
+                invoke_graph(
+                    graph_name='02-tooluse',
+                    message=summary_prompt,
+                    thread_id=chat_sessions[session_id]['thread_id'],
+                    is_new_thread=True
                 )
-            finally:
-                loop.close()
+            )
         except Exception as graph_error:
             # Fallback response when graph is not available
             print(f"Graph error: {graph_error}")
@@ -512,21 +603,46 @@ async def init_app():
         print(f"Warning: Failed to initialize MCP registry: {e}")
         print("Some features may not be available")
 
-def create_app():
-    """Create and configure the Flask app."""
+def warmup_graphs_from_env() -> List[str] | None:
+    """Read WARMUP_GRAPHS ("all" or a comma-separated list of graph names)."""
+    value = os.getenv('WARMUP_GRAPHS', '').strip()
+    if not value:
+        return None
+    if value.lower() == 'all':
+        return []
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+def create_app(warm_up: List[str] | None = None):
+    """Create and configure the Flask app.
+    
+    ``warm_up`` lists graphs to precompile after MCP initialization (an empty
+    list means all graphs); defaults to the WARMUP_GRAPHS environment variable.
+    """
     # Initialize async components
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    try:
-        loop.run_until_complete(init_app())
-    finally:
-        loop.close()
+    run_async(init_app())
+    watch_graph_files()
+    
+    if warm_up is None:
+        warm_up = warmup_graphs_from_env()
+    if warm_up is not None:
+        print(format_warmup_report(warm_up_graphs(warm_up or None)))
     
     return app
 
 if __name__ == '__main__':
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="7 Habits Agent Graph web UI")
+    parser.add_argument(
+        '--warm-up',
+        nargs='*',
+        metavar='GRAPH',
+        help='Precompile graphs at startup (all graphs if no names are given)'
+    )
+    args = parser.parse_args()
+    
     # Initialize and run the app
-    app = create_app()
+    app = create_app(warm_up=args.warm_up)
     port = int(os.getenv('PORT', 5000))
     debug = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
     